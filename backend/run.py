@@ -6,23 +6,38 @@ import socket
 import sys
 import uvicorn
 
+try:
+    import uvloop  # noqa: F401
+    LOOP = "uvloop"
+except ImportError:
+    # uvloop is unavailable on Windows; fall back to the default asyncio loop
+    LOOP = "auto"
+
+try:
+    import httptools  # noqa: F401
+    HTTP = "httptools"
+except ImportError:
+    HTTP = "auto"
 
-def is_port_available(port: int, host: str = "0.0.0.0") -> bool:
-    """Check if a port is available for binding."""
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            sock.bind((host, port))
-            return True
-    except OSError:
-        return False
 
+def bind_available_socket(start_port: int, host: str = "0.0.0.0", max_attempts: int = 10) -> socket.socket:
+    """Bind a listening socket to the first free port starting from start_port.
 
-def find_available_port(start_port: int, host: str = "0.0.0.0", max_attempts: int = 10) -> int:
-    """Find the next available port starting from start_port."""
+    The bound socket is handed to uvicorn as-is, so no other process can
+    take the port between probing and serving.
+    """
+    # A failed bind leaves the socket unbound, so one socket can try every candidate
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     for port in range(start_port, start_port + max_attempts):
-        if is_port_available(port, host):
-            return port
+        try:
+            sock.bind((host, port))
+        except OSError:
+            continue
+        sock.listen()
+        return sock
+
+    sock.close()
     raise RuntimeError(
         f"Could not find an available port in range {start_port}-{start_port + max_attempts - 1}"
     )
@@ -32,24 +47,24 @@ if __name__ == "__main__":
     host = "0.0.0.0"
     preferred_port = 8001
 
-    # Check if preferred port is available
-    if is_port_available(preferred_port, host):
-        port = preferred_port
-        print(f"✓ Starting server on {host}:{port}")
+    try:
+        sock = bind_available_socket(preferred_port, host)
+    except RuntimeError as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    port = sock.getsockname()[1]
+    if port != preferred_port:
+        print(f"⚠ Port {preferred_port} is in use")
+        print(f"✓ Starting server on {host}:{port} instead")
     else:
-        # Find next available port
-        try:
-            port = find_available_port(preferred_port + 1, host)
-            print(f"⚠ Port {preferred_port} is in use")
-            print(f"✓ Starting server on {host}:{port} instead")
-        except RuntimeError as e:
-            print(f"✗ Error: {e}", file=sys.stderr)
-            sys.exit(1)
+        print(f"✓ Starting server on {host}:{port}")
 
     uvicorn.run(
         "src.api.main:app",
-        host=host,
-        port=port,
+        fd=sock.fileno(),
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop=LOOP,
+        http=HTTP
     )
@@ -1,4 +1,7 @@
-from typing import Dict
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
 from ..state import AgentState
 from .optimist import OptimistAgent
 from .pessimist import PessimistAgent
@@ -9,7 +12,14 @@ from ...memory.hybrid_memory import HybridMemory
 class CouncilManager:
     """Orchestrates multi-agent deliberation"""
 
+    # Max number of deliberation results kept in the LRU cache
+    CACHE_SIZE = 256
+
+    # Max deliberations running at once in batch_deliberate
+    BATCH_CONCURRENCY = 8
+
     def __init__(self, use_llm: bool = True):
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
         self.memory = HybridMemory()
         self.optimist = OptimistAgent(use_llm=use_llm)
         self.pessimist = PessimistAgent(use_llm=use_llm)
@@ -22,14 +32,27 @@ class CouncilManager:
         # Initialize memory if not already done
         await self.memory.initialize()
 
-        # 1. Optimist proposes
-        optimist_view = await self.optimist.plan(state.dict())
+        # Serialize once to JSON and share across agents; pydantic's Rust
+        # serializer is fast and the stable field order keeps prompt
+        # prefixes identical between calls (better provider prompt caching)
+        # (version and user_clarifications are bookkeeping the agents don't need)
+        state_json = state.model_dump_json(exclude={"error_message", "version", "user_clarifications"})
 
-        # 2. Pessimist critiques
-        pessimist_view = await self.pessimist.critique(state.dict(), optimist_view)
+        # Identical prompts against unchanged memory (e.g. Socratic re-scans)
+        # skip all four LLM calls
+        key = self._cache_key(state_json)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            state.project_logic = dict(cached)
+            return state
 
-        # 3. Historian verifies
-        historian_view = await self.historian.verify(state.dict())
+        # 1-3. Optimist proposes and Pessimist critiques, while Historian
+        # verifies concurrently (it does not depend on the other two)
+        (optimist_view, pessimist_view), historian_view = await asyncio.gather(
+            self._run_optimist_then_pessimist(state_json),
+            self.historian.verify(state_json)
+        )
 
         # 4. Synthesizer combines
         synthesis = await self.synthesizer.synthesize(
@@ -46,4 +69,33 @@ class CouncilManager:
             "synthesis": synthesis
         }
 
+        self._cache[key] = dict(state.project_logic)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+
         return state
+
+    def _cache_key(self, state_json: str) -> bytes:
+        """Digest of the agents' input and the episodic memory version
+
+        The Historian reads episodic memory, so any write to it must miss.
+        """
+        digest = hashlib.blake2b(state_json.encode(), digest_size=16)
+        digest.update(self.memory.episodic_version.to_bytes(8, "little"))
+        return digest.digest()
+
+    async def batch_deliberate(self, states: List[AgentState]) -> List[AgentState]:
+        """Deliberate over many states concurrently, bounded by BATCH_CONCURRENCY"""
+        semaphore = asyncio.Semaphore(self.BATCH_CONCURRENCY)
+
+        async def bounded(state: AgentState) -> AgentState:
+            async with semaphore:
+                return await self.deliberate(state)
+
+        return list(await asyncio.gather(*(bounded(s) for s in states)))
+
+    async def _run_optimist_then_pessimist(self, state_json: str) -> Tuple[str, str]:
+        """Pessimist critiques the Optimist's plan, so these run in sequence"""
+        optimist_view = await self.optimist.plan(state_json)
+        pessimist_view = await self.pessimist.critique(state_json, optimist_view)
+        return optimist_view, pessimist_view
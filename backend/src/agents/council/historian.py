@@ -1,31 +1,46 @@
-from langchain_anthropic import ChatAnthropic
+from typing import Optional
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from ...memory.query_cache import QueryCache
+from ...llm.anthropic_client import DEFAULT_MODEL, get_shared_llm
+from ...routing.model_router import get_shared_router
 
 class HistorianAgent:
     """Ensures consistency with past decisions"""
 
-    def __init__(self, memory, use_llm: bool = True):
+    def __init__(self, memory, use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.llm_enabled = use_llm
         self.memory = memory
         if use_llm:
-            self.llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0.2)
+            self.llm = llm or get_shared_llm(temperature=0.2)
             self.prompt = ChatPromptTemplate.from_messages([
                 ("system", "You verify consistency with past decisions and documentation. Check for contradictions."),
                 ("user", "{input}\n\nPast decisions: {history}")
             ])
+            self.chain = self.prompt | get_shared_router().limit(self.llm, DEFAULT_MODEL)
+            # Repeated states reuse the previous retrieval until memory changes
+            self.history_cache = QueryCache()
+            self._cache_version = memory.episodic_version
         else:
             self.llm = None
             self.prompt = None
+            self.chain = None
+            self.history_cache = None
 
-    async def verify(self, state: dict) -> str:
+    async def verify(self, state: str) -> str:
         if self.llm_enabled and self.llm:
             # Retrieve relevant history
-            history = await self.memory.retrieve_episodic(str(state), k=3)
-            history_text = "\n".join([h["content"] for h in history])
+            if self.memory.episodic_version != self._cache_version:
+                self.history_cache.clear()
+                self._cache_version = self.memory.episodic_version
+            history = await self.history_cache.get_or_compute(
+                state,
+                lambda: self.memory.retrieve_episodic(state, k=3)
+            )
+            history_text = "\n".join(h["content"] for h in history)
 
-            chain = self.prompt | self.llm
-            response = await chain.ainvoke({
-                "input": str(state),
+            response = await self.chain.ainvoke({
+                "input": state,
                 "history": history_text
             })
             return response.content
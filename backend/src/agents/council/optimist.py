@@ -1,25 +1,30 @@
-from langchain_anthropic import ChatAnthropic
+from typing import Optional
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from ...llm.anthropic_client import DEFAULT_MODEL, get_shared_llm
+from ...routing.model_router import get_shared_router
 
 class OptimistAgent:
     """Generates ambitious, creative plans"""
 
-    def __init__(self, use_llm: bool = True):
+    def __init__(self, use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.use_llm = use_llm
         if use_llm:
-            self.llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0.8)
+            self.llm = llm or get_shared_llm(temperature=0.8)
             self.prompt = ChatPromptTemplate.from_messages([
                 ("system", "You are an optimistic strategist. Propose ambitious plans that maximize opportunity and innovation. Ignore constraints temporarily."),
                 ("user", "{input}")
             ])
+            self.chain = self.prompt | get_shared_router().limit(self.llm, DEFAULT_MODEL)
         else:
             self.llm = None
             self.prompt = None
+            self.chain = None
 
-    async def plan(self, state: dict) -> str:
+    async def plan(self, state: str) -> str:
         if self.use_llm and self.llm:
-            chain = self.prompt | self.llm
-            response = await chain.ainvoke({"input": str(state)})
+            response = await self.chain.ainvoke({"input": state})
             return response.content
         else:
             return "Optimist view: Launch boldly with maximum features and market impact. Focus on innovation and first-mover advantage."
+
@@ -1,25 +1,29 @@
-from langchain_anthropic import ChatAnthropic
+from typing import Optional
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from ...llm.anthropic_client import DEFAULT_MODEL, get_shared_llm
+from ...routing.model_router import get_shared_router
 
 class PessimistAgent:
     """Identifies risks and failure modes"""
 
-    def __init__(self, use_llm: bool = True):
+    def __init__(self, use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.use_llm = use_llm
         if use_llm:
-            self.llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0.3)
+            self.llm = llm or get_shared_llm(temperature=0.3)
             self.prompt = ChatPromptTemplate.from_messages([
                 ("system", "You are a risk analyst. Identify all possible failure modes, resource gaps, and worst-case scenarios. Be thorough and skeptical."),
                 ("user", "{input}")
             ])
+            self.chain = self.prompt | get_shared_router().limit(self.llm, DEFAULT_MODEL)
         else:
             self.llm = None
             self.prompt = None
+            self.chain = None
 
-    async def critique(self, state: dict, optimist_plan: str) -> str:
+    async def critique(self, state: str, optimist_plan: str) -> str:
         if self.use_llm and self.llm:
-            chain = self.prompt | self.llm
-            response = await chain.ainvoke({
+            response = await self.chain.ainvoke({
                 "input": f"State: {state}\n\nProposed Plan: {optimist_plan}"
             })
             return response.content
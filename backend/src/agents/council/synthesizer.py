@@ -1,35 +1,38 @@
-from langchain_anthropic import ChatAnthropic
-from langchain_core.prompts import ChatPromptTemplate
+from typing import Optional
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from ...llm.anthropic_client import DEFAULT_MODEL, get_shared_llm
+from ...routing.model_router import get_shared_router
 
 class SynthesizerAgent:
     """Combines perspectives into balanced plan"""
 
-    def __init__(self, use_llm: bool = True):
+    def __init__(self, use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.use_llm = use_llm
         if use_llm:
-            self.llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0.5)
-            self.prompt = ChatPromptTemplate.from_messages([
-                ("system", "You synthesize diverse viewpoints into a balanced, executable plan. Balance ambition with pragmatism."),
-                ("user", """Optimist view: {optimist}
+            self.llm = llm or get_shared_llm(temperature=0.5)
+            # The prompt is static, so build messages directly instead of
+            # running three large views through the template engine
+            self.system_message = SystemMessage(
+                content="You synthesize diverse viewpoints into a balanced, executable plan. Balance ambition with pragmatism."
+            )
+        else:
+            self.llm = None
+            self.system_message = None
+
+    async def synthesize(self, optimist: str, pessimist: str, historian: str) -> str:
+        if self.use_llm and self.llm:
+            async with get_shared_router().acquire(DEFAULT_MODEL):
+                response = await self.llm.ainvoke([
+                    self.system_message,
+                    HumanMessage(content=f"""Optimist view: {optimist}
 
 Pessimist view: {pessimist}
 
 Historian view: {historian}
 
 Create synthesis:""")
-            ])
-        else:
-            self.llm = None
-            self.prompt = None
-
-    async def synthesize(self, optimist: str, pessimist: str, historian: str) -> str:
-        if self.use_llm and self.llm:
-            chain = self.prompt | self.llm
-            response = await chain.ainvoke({
-                "optimist": optimist,
-                "pessimist": pessimist,
-                "historian": historian
-            })
+                ])
             return response.content
         else:
             return "Synthesis: Launch in 2 months with phased rollout. MVP with core features first, then iterate. Build in buffer time for quality assurance."
@@ -1,69 +1,83 @@
-from typing import Literal
+from typing import Callable, ClassVar, Dict, Literal, Optional
 from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 from .state import AgentState, StateNode
 
+# Next node per current node; only the scanner branches on state
+_TRANSITIONS: Dict[StateNode, Callable[[AgentState], StateNode]] = {
+    StateNode.AMBIGUITY_SCANNER: lambda s: (
+        StateNode.SOCRATIC_INTERROGATOR if s.ambiguity_score > 0.7
+        else StateNode.ONTOLOGY_ARCHITECT
+    ),
+    # After clarification, re-scan
+    StateNode.SOCRATIC_INTERROGATOR: lambda s: StateNode.AMBIGUITY_SCANNER,
+    StateNode.ONTOLOGY_ARCHITECT: lambda s: StateNode.STRATEGY_MOTOR,
+    StateNode.STRATEGY_MOTOR: lambda s: StateNode.EXECUTOR,
+    StateNode.EXECUTOR: lambda s: StateNode.REFLECTOR,
+    # Check if optimization needed
+    StateNode.REFLECTOR: lambda s: StateNode.STRATEGY_MOTOR,  # or END
+}
+
+def _to_end(state: AgentState) -> str:
+    return END
+
 class CognitiveGraph:
+    # Compiled once per class and shared by every instance
+    _COMPILED: ClassVar[Optional[CompiledStateGraph]] = None
+
     def __init__(self):
         self.graph = self._build_graph()
 
     def determine_transition(self, state: AgentState) -> StateNode:
         """Determine next node based on state"""
-        if state.current_node == StateNode.AMBIGUITY_SCANNER:
-            if state.ambiguity_score > 0.7:
-                return StateNode.SOCRATIC_INTERROGATOR
-            else:
-                return StateNode.ONTOLOGY_ARCHITECT
-
-        elif state.current_node == StateNode.SOCRATIC_INTERROGATOR:
-            # After clarification, re-scan
-            return StateNode.AMBIGUITY_SCANNER
-
-        elif state.current_node == StateNode.ONTOLOGY_ARCHITECT:
-            return StateNode.STRATEGY_MOTOR
-
-        elif state.current_node == StateNode.STRATEGY_MOTOR:
-            return StateNode.EXECUTOR
-
-        elif state.current_node == StateNode.EXECUTOR:
-            return StateNode.REFLECTOR
-
-        elif state.current_node == StateNode.REFLECTOR:
-            # Check if optimization needed
-            return StateNode.STRATEGY_MOTOR  # or END
+        return _TRANSITIONS.get(state.current_node, _to_end)(state)
 
-        return END
+    @classmethod
+    def _build_graph(cls) -> CompiledStateGraph:
+        # Look up on the class itself so subclasses compile their own graph
+        if cls.__dict__.get("_COMPILED") is None:
+            cls._COMPILED = cls._construct().compile()
+        return cls._COMPILED
 
-    def _build_graph(self) -> StateGraph:
+    @classmethod
+    def _construct(cls) -> StateGraph:
         workflow = StateGraph(AgentState)
 
         # Add nodes (implement in next task)
-        workflow.add_node("ambiguity_scanner", self._ambiguity_scanner_node)
-        workflow.add_node("socratic_interrogator", self._socratic_interrogator_node)
-        workflow.add_node("ontology_architect", self._ontology_architect_node)
-        workflow.add_node("strategy_motor", self._strategy_motor_node)
-        workflow.add_node("executor", self._executor_node)
-        workflow.add_node("reflector", self._reflector_node)
+        workflow.add_node("ambiguity_scanner", cls._ambiguity_scanner_node)
+        workflow.add_node("socratic_interrogator", cls._socratic_interrogator_node)
+        workflow.add_node("ontology_architect", cls._ontology_architect_node)
+        workflow.add_node("strategy_motor", cls._strategy_motor_node)
+        workflow.add_node("executor", cls._executor_node)
+        workflow.add_node("reflector", cls._reflector_node)
 
         # Add conditional edges
         workflow.set_entry_point("ambiguity_scanner")
 
-        return workflow.compile()
+        return workflow
 
-    # Placeholder node functions (implement in subsequent tasks)
-    async def _ambiguity_scanner_node(self, state: AgentState) -> AgentState:
+    # Placeholder node functions (implement in subsequent tasks).
+    # Static so the shared compiled graph holds no per-instance state.
+    @staticmethod
+    async def _ambiguity_scanner_node(state: AgentState) -> AgentState:
         return state
 
-    async def _socratic_interrogator_node(self, state: AgentState) -> AgentState:
+    @staticmethod
+    async def _socratic_interrogator_node(state: AgentState) -> AgentState:
         return state
 
-    async def _ontology_architect_node(self, state: AgentState) -> AgentState:
+    @staticmethod
+    async def _ontology_architect_node(state: AgentState) -> AgentState:
         return state
 
-    async def _strategy_motor_node(self, state: AgentState) -> AgentState:
+    @staticmethod
+    async def _strategy_motor_node(state: AgentState) -> AgentState:
         return state
 
-    async def _executor_node(self, state: AgentState) -> AgentState:
+    @staticmethod
+    async def _executor_node(state: AgentState) -> AgentState:
         return state
 
-    async def _reflector_node(self, state: AgentState) -> AgentState:
+    @staticmethod
+    async def _reflector_node(state: AgentState) -> AgentState:
         return state
@@ -1,7 +1,23 @@
-from typing import List, Set, Optional
-from langchain_anthropic import ChatAnthropic
+import asyncio
+import re
+from typing import List, Set, Optional, Pattern
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from ..state import AgentState
+from ...memory.query_cache import QueryCache
+from ...llm.anthropic_client import get_shared_llm
+from ...routing.model_router import get_shared_router
+
+
+def _score(vague_count: int, word_count: int) -> float:
+    """Combine vague-term density and input length into a 0-1 ambiguity score"""
+    vague_ratio = vague_count / word_count
+
+    # Short input = higher ambiguity
+    length_penalty = max(0.0, 1.0 - word_count / 20)
+
+    return min(1.0, vague_ratio * 2 + length_penalty * 0.5)
+
 
 class AmbiguityScanner:
     """
@@ -17,10 +33,27 @@ class AmbiguityScanner:
         "handle", "deal with", "work on", "something", "stuff", "business"
     }
 
-    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True):
+    # Single compiled alternation so vague terms (including multi-word ones)
+    # are matched in one C-level pass; longest terms first so they win
+    VAGUE_RE: Pattern[str] = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, sorted(VAGUE_TERMS, key=len, reverse=True))) + r")\b"
+    )
+
+    # Inputs longer than this (in characters) are scored in chunks of this
+    # size, yielding to the event loop between chunks
+    SCORE_CHUNK = 16384
+
+    # Longest vague term; a multi-word term can straddle a chunk cut by at
+    # most this many characters on either side
+    MAX_TERM_LEN = max(map(len, VAGUE_TERMS))
+
+    # Max in-flight LLM requests for batch_analyze
+    BATCH_CONCURRENCY = 8
+
+    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.use_llm = use_llm
         if use_llm:
-            self.llm = ChatAnthropic(model=model, temperature=0.3)
+            self.llm = llm or get_shared_llm(model, temperature=0.3)
             self.prompt = ChatPromptTemplate.from_messages([
                 ("system", """You are an ambiguity detection system. Analyze user input and identify:
 1. Vague terms lacking specificity
@@ -35,24 +68,72 @@ Return a JSON with:
 """),
                 ("user", "{input}")
             ])
+            self.chain = self.prompt | get_shared_router().limit(self.llm, model)
+            # The prompt only sees the input text, so results are safe to
+            # share across sessions
+            self.analysis_cache = QueryCache(ttl=300.0, capacity=1024)
         else:
             self.llm = None
             self.prompt = None
+            self.chain = None
+            self.analysis_cache = None
 
     async def analyze(self, state: AgentState) -> AgentState:
         """Analyze input and calculate ambiguity score"""
 
         # Lexical analysis
-        lexical_score = self._calculate_lexical_ambiguity(state.user_input)
+        lexical_score = await self._lexical_score(state.user_input)
 
         # LLM-based semantic analysis (if enabled)
         if self.use_llm and self.llm:
-            chain = self.prompt | self.llm
-            response = await chain.ainvoke({"input": state.user_input})
-            content = response.content
+            # Repeated inputs (onboarding prompts, retries) skip the LLM call
+            content = await self.analysis_cache.get_or_compute(
+                state.user_input,
+                lambda: self._semantic_analysis(state.user_input)
+            )
         else:
             content = "Lexical analysis only"
 
+        return self._record(state, lexical_score, content)
+
+    async def _semantic_analysis(self, text: str) -> str:
+        response = await self.chain.ainvoke({"input": text})
+        return response.content
+
+    async def batch_analyze(self, states: List[AgentState]) -> List[AgentState]:
+        """
+        Analyze many inputs at once.
+
+        In LLM mode inputs already in `analysis_cache` are reused, and each
+        distinct remaining input goes through `abatch`, letting the provider
+        client pipeline up to BATCH_CONCURRENCY requests instead of issuing
+        them one at a time.
+        """
+        lexical_scores = [await self._lexical_score(s.user_input) for s in states]
+
+        if self.use_llm and self.llm:
+            cached = {s.user_input: self.analysis_cache.get(s.user_input) for s in states}
+            misses = [text for text, content in cached.items() if content is None]
+            if misses:
+                responses = await self.chain.abatch(
+                    [{"input": text} for text in misses],
+                    config={"max_concurrency": self.BATCH_CONCURRENCY}
+                )
+                for text, response in zip(misses, responses):
+                    self.analysis_cache.put(text, response.content)
+                    cached[text] = response.content
+            contents = [cached[s.user_input] for s in states]
+        else:
+            contents = ["Lexical analysis only"] * len(states)
+
+        return [
+            self._record(state, score, content)
+            for state, score, content in zip(states, lexical_scores, contents)
+        ]
+
+    def _record(self, state: AgentState, lexical_score: float, content: str) -> AgentState:
+        """Write the analysis result onto the state"""
+
         # Use only lexical score if LLM is disabled
         ambiguity_score = lexical_score
 
@@ -66,18 +147,52 @@ Return a JSON with:
 
         return state
 
+    async def _lexical_score(self, text: str) -> float:
+        """Lexical ambiguity, scored chunk by chunk for very large inputs"""
+        if len(text) <= self.SCORE_CHUNK:
+            return self._calculate_lexical_ambiguity(text)
+
+        lower = text.lower()
+        word_count = 0
+        vague_count = 0
+        start = 0
+        while start < len(lower):
+            end = start + self.SCORE_CHUNK
+            if end < len(lower):
+                # Cut just after a whitespace so no word is split across chunks
+                cut = max(lower.rfind(" ", start, end), lower.rfind("\n", start, end))
+                end = cut + 1 if cut > start else end
+            chunk = lower[start:end]
+            word_count += len(chunk.split())
+            vague_count += len(self.VAGUE_RE.findall(chunk))
+            if start:
+                vague_count += self._straddling_terms(lower, start)
+            start = end
+            # Let other coroutines run between chunks
+            await asyncio.sleep(0)
+
+        if word_count == 0:
+            return 1.0
+        return _score(vague_count, word_count)
+
+    def _straddling_terms(self, lower: str, cut: int) -> int:
+        """Count multi-word vague terms that span the chunk boundary at `cut`"""
+        lo = max(0, cut - self.MAX_TERM_LEN)
+        window = lower[lo:cut + self.MAX_TERM_LEN]
+        offset = cut - lo
+        return sum(
+            1 for m in self.VAGUE_RE.finditer(window)
+            if m.start() < offset < m.end()
+        )
+
     def _calculate_lexical_ambiguity(self, text: str) -> float:
         """Calculate ambiguity based on word analysis"""
-        words = text.lower().split()
-        vague_count = sum(1 for word in words if word in self.VAGUE_TERMS)
+        lower = text.lower()
+        word_count = len(lower.split())
 
         # High vagueness = high ambiguity
-        if len(words) == 0:
+        if word_count == 0:
             return 1.0
 
-        vague_ratio = vague_count / len(words)
-
-        # Short input = higher ambiguity
-        length_penalty = max(0, 1 - len(words) / 20)
-
-        return min(1.0, vague_ratio * 2 + length_penalty * 0.5)
+        vague_count = len(self.VAGUE_RE.findall(lower))
+        return _score(vague_count, word_count)
@@ -1,9 +1,12 @@
+import copy
 from typing import List, Dict, Any, Optional
-from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 from ..state import AgentState
+from ...llm.anthropic_client import get_shared_llm
+from ...routing.model_router import get_shared_router
 
 class KPI(BaseModel):
     name: str
@@ -14,6 +17,33 @@ class KPI(BaseModel):
     optimization_direction: str  # "maximize" or "minimize"
     formula: Optional[str] = None  # SQL/Python code if applicable
 
+# Fixed KPIs for offline mode
+_OFFLINE_KPIS: List[Dict[str, Any]] = [
+    {
+        "name": "Team Stress Index",
+        "description": "Measures overall team stress based on work patterns",
+        "measurement_method": "Aggregate of after-hours commits, weekend work, and response times",
+        "data_source": "Git commits, calendar events, communication logs",
+        "optimization_direction": "minimize",
+        "formula": "(after_hours_commits * 0.4 + weekend_commits * 0.3 + avg_response_time * 0.3)"
+    },
+    {
+        "name": "Team Sentiment Score",
+        "description": "Tracks emotional tone in team communications",
+        "measurement_method": "Sentiment analysis on messages and comments",
+        "data_source": "Chat messages, code review comments, meeting notes",
+        "optimization_direction": "maximize",
+        "target_value": "> 0.7"
+    },
+    {
+        "name": "Work-Life Balance Indicator",
+        "description": "Measures boundary between work and personal time",
+        "measurement_method": "Ratio of work during business hours vs non-business hours",
+        "data_source": "Activity logs, commit timestamps",
+        "optimization_direction": "maximize"
+    }
+]
+
 class KPIFabricator:
     """
     Creates custom KPIs from qualitative user goals.
@@ -22,10 +52,10 @@ class KPIFabricator:
     Example: "less stressed team" -> "After-hours commit rate", "Sentiment score"
     """
 
-    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True):
+    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.use_llm = use_llm
         if use_llm:
-            self.llm = ChatAnthropic(model=model, temperature=0.5)
+            self.llm = llm or get_shared_llm(model, temperature=0.5)
             self.parser = JsonOutputParser()
 
             self.prompt = ChatPromptTemplate.from_messages([
@@ -56,10 +86,12 @@ Available entities:
 
 Generate KPIs:""")
             ])
+            self.chain = self.prompt | get_shared_router().limit(self.llm, model) | self.parser
         else:
             self.llm = None
             self.parser = None
             self.prompt = None
+            self.chain = None
 
     async def fabricate_kpis(self, state: AgentState) -> AgentState:
         """Generate custom KPIs from user goals"""
@@ -71,9 +103,7 @@ Generate KPIs:""")
                 for e in state.domain_ontology.get("entities", [])
             ])
 
-            chain = self.prompt | self.llm | self.parser
-
-            result = await chain.ainvoke({
+            result = await self.chain.ainvoke({
                 "user_goal": state.user_input,
                 "entities": entities_desc
             })
@@ -81,32 +111,8 @@ Generate KPIs:""")
             # Store KPIs
             state.kpis = result["kpis"] if isinstance(result, dict) else result
         else:
-            # Generate hardcoded KPIs for testing
-            state.kpis = [
-                {
-                    "name": "Team Stress Index",
-                    "description": "Measures overall team stress based on work patterns",
-                    "measurement_method": "Aggregate of after-hours commits, weekend work, and response times",
-                    "data_source": "Git commits, calendar events, communication logs",
-                    "optimization_direction": "minimize",
-                    "formula": "(after_hours_commits * 0.4 + weekend_commits * 0.3 + avg_response_time * 0.3)"
-                },
-                {
-                    "name": "Team Sentiment Score",
-                    "description": "Tracks emotional tone in team communications",
-                    "measurement_method": "Sentiment analysis on messages and comments",
-                    "data_source": "Chat messages, code review comments, meeting notes",
-                    "optimization_direction": "maximize",
-                    "target_value": "> 0.7"
-                },
-                {
-                    "name": "Work-Life Balance Indicator",
-                    "description": "Measures boundary between work and personal time",
-                    "measurement_method": "Ratio of work during business hours vs non-business hours",
-                    "data_source": "Activity logs, commit timestamps",
-                    "optimization_direction": "maximize"
-                }
-            ]
+            # Hardcoded KPIs for testing
+            state.kpis = copy.deepcopy(_OFFLINE_KPIS)
 
         # Add to conversation
         state.conversation_history.append({
@@ -1,8 +1,52 @@
-from langchain_anthropic import ChatAnthropic
+import copy
+from typing import Any, Dict, Optional
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from ..state import AgentState
 from ...ontology.schema_generator import DomainOntology, EntitySchema, RelationshipSchema
+from ...llm.anthropic_client import get_shared_llm
+from ...routing.model_router import get_shared_router
+
+# Offline ontology, built once at import; each state gets its own deep copy
+_OFFLINE_ONTOLOGY: Dict[str, Any] = {
+    "domain": "electronics supply chain",
+    "entities": [
+        {
+            "type": "Supplier",
+            "properties": {"name": "str", "lead_time": "int", "cost_per_unit": "float"},
+            "description": "Provider of raw materials or components"
+        },
+        {
+            "type": "Inventory",
+            "properties": {"sku": "str", "quantity": "int", "location": "str"},
+            "description": "Stock of materials or finished goods"
+        },
+        {
+            "type": "Order",
+            "properties": {"order_id": "str", "quantity": "int", "delivery_date": "date"},
+            "description": "Purchase order from supplier or customer"
+        }
+    ],
+    "relationships": [
+        {
+            "from_entity": "Supplier",
+            "to_entity": "Inventory",
+            "type": "SUPPLIES_TO",
+            "properties": {"lead_time": "int"}
+        },
+        {
+            "from_entity": "Order",
+            "to_entity": "Inventory",
+            "type": "AFFECTS",
+            "properties": {"quantity_change": "int"}
+        }
+    ],
+    "logic_rules": [
+        "Inventory level must stay above safety stock threshold",
+        "Orders must be placed lead_time days before needed"
+    ]
+}
 
 class OntologyArchitect:
     """
@@ -13,10 +57,10 @@ class OntologyArchitect:
     not from predefined templates.
     """
 
-    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True):
+    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.use_llm = use_llm
         if use_llm:
-            self.llm = ChatAnthropic(model=model, temperature=0.4)
+            self.llm = llm or get_shared_llm(model, temperature=0.4)
             self.parser = JsonOutputParser(pydantic_object=DomainOntology)
 
             self.prompt = ChatPromptTemplate.from_messages([
@@ -50,72 +94,31 @@ Clarifications:
 {clarifications}
 
 Generate domain ontology:""")
-            ])
+            ]).partial(
+                format_instructions=self.parser.get_format_instructions()
+            )
+            self.chain = self.prompt | get_shared_router().limit(self.llm, model) | self.parser
         else:
             self.llm = None
             self.parser = None
             self.prompt = None
+            self.chain = None
 
     async def generate_ontology(self, state: AgentState) -> AgentState:
         """Generate domain ontology from conversation"""
 
         if self.use_llm and self.llm:
-            # Extract clarifications from history
-            clarifications = "\n".join([
-                f"- {msg.get('clarification', msg.get('content', ''))}"
-                for msg in state.conversation_history
-                if msg.get("role") == "user"
-            ])
+            clarifications = "\n".join(f"- {c}" for c in state.user_clarifications)
 
-            chain = self.prompt | self.llm | self.parser
-
-            result = await chain.ainvoke({
+            result = await self.chain.ainvoke({
                 "original_input": state.user_input,
-                "clarifications": clarifications,
-                "format_instructions": self.parser.get_format_instructions()
+                "clarifications": clarifications
             })
 
             ontology = result
         else:
-            # Generate simple hardcoded ontology for testing
-            ontology = {
-                "domain": "electronics supply chain",
-                "entities": [
-                    {
-                        "type": "Supplier",
-                        "properties": {"name": "str", "lead_time": "int", "cost_per_unit": "float"},
-                        "description": "Provider of raw materials or components"
-                    },
-                    {
-                        "type": "Inventory",
-                        "properties": {"sku": "str", "quantity": "int", "location": "str"},
-                        "description": "Stock of materials or finished goods"
-                    },
-                    {
-                        "type": "Order",
-                        "properties": {"order_id": "str", "quantity": "int", "delivery_date": "date"},
-                        "description": "Purchase order from supplier or customer"
-                    }
-                ],
-                "relationships": [
-                    {
-                        "from_entity": "Supplier",
-                        "to_entity": "Inventory",
-                        "type": "SUPPLIES_TO",
-                        "properties": {"lead_time": "int"}
-                    },
-                    {
-                        "from_entity": "Order",
-                        "to_entity": "Inventory",
-                        "type": "AFFECTS",
-                        "properties": {"quantity_change": "int"}
-                    }
-                ],
-                "logic_rules": [
-                    "Inventory level must stay above safety stock threshold",
-                    "Orders must be placed lead_time days before needed"
-                ]
-            }
+            # Simple hardcoded ontology for testing
+            ontology = copy.deepcopy(_OFFLINE_ONTOLOGY)
 
         # Store in state
         state.domain_ontology = ontology
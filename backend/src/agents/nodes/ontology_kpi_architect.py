@@ -0,0 +1,98 @@
+from typing import List, Optional
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel
+from ..state import AgentState
+from .ontology_architect import OntologyArchitect
+from .kpi_fabricator import KPI, KPIFabricator
+from ...ontology.schema_generator import DomainOntology
+from ...llm.anthropic_client import get_shared_llm
+from ...routing.model_router import get_shared_router
+
+class OntologyWithKPIs(BaseModel):
+    ontology: DomainOntology
+    kpis: List[KPI]
+
+class OntologyKPIArchitect:
+    """
+    Generates the domain ontology and its KPIs in a single LLM call.
+
+    Running OntologyArchitect then KPIFabricator costs two round trips that
+    both prefill the same user context; here the model drafts the ontology
+    and derives KPIs from it in one structured response. Without an LLM it
+    delegates to the two offline nodes.
+    """
+
+    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True, llm: Optional[BaseChatModel] = None):
+        self.use_llm = use_llm
+        if use_llm:
+            self.llm = llm or get_shared_llm(model, temperature=0.4)
+            self.parser = JsonOutputParser(pydantic_object=OntologyWithKPIs)
+
+            self.prompt = ChatPromptTemplate.from_messages([
+                ("system", """You are an ontology architect and KPI fabricator.
+
+First, generate a domain-specific ontology for the user's clarified requirements:
+1. **Entities**: Core objects/concepts in this domain, with properties and a description
+2. **Relationships**: How entities connect (source, target, type, properties)
+3. **Logic Rules**: Domain-specific constraints
+
+Don't use generic "Task/Project" unless that's truly the domain.
+
+Then, using that ontology's entities as data sources, create 2-4 measurable KPIs
+for the user's goal. Each KPI needs a name, description, measurement method,
+data source, optimization direction ("maximize" or "minimize"), and optionally
+a target value and SQL/Python formula. Be creative with proxy metrics.
+
+{format_instructions}
+"""),
+                ("user", """Original input: {original_input}
+
+Clarifications:
+{clarifications}
+
+Generate domain ontology and KPIs:""")
+            ]).partial(
+                format_instructions=self.parser.get_format_instructions()
+            )
+            self.chain = self.prompt | get_shared_router().limit(self.llm, model) | self.parser
+            self.architect = None
+            self.fabricator = None
+        else:
+            self.llm = None
+            self.parser = None
+            self.prompt = None
+            self.chain = None
+            self.architect = OntologyArchitect(use_llm=False)
+            self.fabricator = KPIFabricator(use_llm=False)
+
+    async def generate(self, state: AgentState) -> AgentState:
+        """Generate domain ontology and KPIs from conversation"""
+
+        if not (self.use_llm and self.llm):
+            state = await self.architect.generate_ontology(state)
+            return await self.fabricator.fabricate_kpis(state)
+
+        result = await self.chain.ainvoke({
+            "original_input": state.user_input,
+            "clarifications": "\n".join(f"- {c}" for c in state.user_clarifications)
+        })
+
+        # Store in state
+        state.domain_ontology = result["ontology"]
+        state.kpis = result["kpis"]
+
+        # Add to conversation, as the two separate nodes would
+        state.conversation_history.append({
+            "role": "assistant",
+            "type": "ontology",
+            "content": f"Generated domain ontology with {len(state.domain_ontology['entities'])} entities"
+        })
+        state.conversation_history.append({
+            "role": "assistant",
+            "type": "kpis",
+            "content": f"Created {len(state.kpis)} custom KPIs"
+        })
+
+        return state
@@ -1,9 +1,11 @@
-from typing import List
-from langchain_anthropic import ChatAnthropic
+from typing import Any, Dict, List, Optional
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 from ..state import AgentState
+from ...llm.anthropic_client import get_shared_llm
+from ...routing.model_router import get_shared_router
 
 class ClarifyingQuestions(BaseModel):
     questions: List[str] = Field(description="List of clarifying questions")
@@ -19,10 +21,10 @@ class SocraticInterrogator:
     - Success criteria definition
     """
 
-    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True):
+    def __init__(self, model: str = "claude-3-5-sonnet-20241022", use_llm: bool = True, llm: Optional[BaseChatModel] = None):
         self.use_llm = use_llm
         if use_llm:
-            self.llm = ChatAnthropic(model=model, temperature=0.7)
+            self.llm = llm or get_shared_llm(model, temperature=0.7)
             self.parser = JsonOutputParser(pydantic_object=ClarifyingQuestions)
 
             self.prompt = ChatPromptTemplate.from_messages([
@@ -39,23 +41,30 @@ Be concise and focused.
 
 {format_instructions}
 """),
-                ("user", "User input: {input}\n\nAmbiguity score: {ambiguity_score}")
-            ])
+                ("user", "User input: {input}\n\nAmbiguity score: {ambiguity_score}\n\nRelated past conversations:\n{episodes}")
+            ]).partial(
+                # Render the parser schema once rather than on every call
+                format_instructions=self.parser.get_format_instructions()
+            )
+            self.chain = self.prompt | get_shared_router().limit(self.llm, model) | self.parser
         else:
             self.llm = None
             self.parser = None
             self.prompt = None
+            self.chain = None
 
-    async def generate_questions(self, state: AgentState) -> AgentState:
-        """Generate clarifying questions based on ambiguous input"""
+    async def generate_questions(
+        self,
+        state: AgentState,
+        episodes: Optional[List[Dict[str, Any]]] = None
+    ) -> AgentState:
+        """Generate clarifying questions based on ambiguous input and related past episodes"""
 
         if self.use_llm and self.llm:
-            chain = self.prompt | self.llm | self.parser
-
-            result = await chain.ainvoke({
+            result = await self.chain.ainvoke({
                 "input": state.user_input,
                 "ambiguity_score": state.ambiguity_score,
-                "format_instructions": self.parser.get_format_instructions()
+                "episodes": "\n".join(f"- {e['content']}" for e in episodes or []) or "- none"
             })
 
             questions = result["questions"]
@@ -1,6 +1,6 @@
 from enum import Enum
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 class StateNode(str, Enum):
     AMBIGUITY_SCANNER = "ambiguity_scanner"
@@ -13,9 +13,33 @@ class StateNode(str, Enum):
 class AgentState(BaseModel):
     current_node: StateNode
     user_input: str
-    conversation_history: List[Dict[str, str]] = Field(default_factory=list)
+    # Entries can hold lists (e.g. "questions"), not only strings
+    conversation_history: List[Dict[str, Any]] = Field(default_factory=list)
     ambiguity_score: float = 0.0
     domain_ontology: Optional[Dict[str, Any]] = None
     project_logic: Optional[Dict[str, Any]] = None
     kpis: Optional[List[Dict[str, Any]]] = None
     error_message: Optional[str] = None
+    # Bumped on every committed update so concurrent writers can detect
+    # that the state moved on under them
+    version: int = 0
+    # Plain text of every user clarification in history, kept alongside it
+    # so readers don't have to walk the whole history
+    user_clarifications: List[str] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _collect_user_clarifications(self) -> "AgentState":
+        # States built directly from a history get the list derived once here
+        if "user_clarifications" not in self.model_fields_set:
+            self.user_clarifications = [
+                msg.get("clarification", msg.get("content", ""))
+                for msg in self.conversation_history
+                if msg.get("role") == "user"
+            ]
+        return self
+
+
+def append_user_clarification(state: AgentState, text: str) -> None:
+    """Record a user clarification in the history and the flat list"""
+    state.conversation_history.append({"role": "user", "clarification": text})
+    state.user_clarifications.append(text)
@@ -0,0 +1,13 @@
+from fastapi import Request
+from .session_store import SessionStore
+from ..memory.hybrid_memory import HybridMemory
+
+
+def get_session_store(request: Request) -> SessionStore:
+    """Session store created in the app lifespan"""
+    return request.app.state.sessions
+
+
+def get_memory(request: Request) -> HybridMemory:
+    """Hybrid memory initialized in the app lifespan"""
+    return request.app.state.memory
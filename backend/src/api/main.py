@@ -1,8 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
 from .routes import agent
+from .session_store import SessionStore
+from ..core.config import get_config
+from ..memory.hybrid_memory import HybridMemory
 
-app = FastAPI(title="Rpd Ganis GIU API")
+
+def _session_store() -> SessionStore:
+    """Redis-backed when REDIS_URL is configured, in-memory otherwise"""
+    try:
+        config = get_config()
+    except ValidationError as e:
+        # Incomplete settings (e.g. no .env in development)
+        print(f"Falling back to in-memory sessions: {e}")
+        return SessionStore()
+    return SessionStore(config=config, use_memory=not config.redis_url)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One session store and one memory (with their connection pools) for the
+    # whole process, rather than a driver handshake per request
+    app.state.sessions = _session_store()
+    app.state.memory = HybridMemory()
+    purge_task = None
+
+    try:
+        await app.state.sessions.connect()
+        await app.state.memory.initialize()
+        # Expire abandoned sessions off the request path
+        purge_task = asyncio.create_task(app.state.sessions.run_purge_loop())
+        yield
+    finally:
+        if purge_task:
+            purge_task.cancel()
+        await app.state.memory.close()
+        await app.state.sessions.close()
+
+
+# orjson renders responses several times faster than the stdlib encoder
+app = FastAPI(title="Rpd Ganis GIU API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS for Swift app
 app.add_middleware(
@@ -1,53 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import asyncio
-from datetime import datetime, timedelta
-from ...agents.graph import CognitiveGraph
-from ...agents.state import AgentState, StateNode
+from ...agents.nodes.ambiguity_scanner import AmbiguityScanner
+from ...agents.nodes.socratic_interrogator import SocraticInterrogator
+from ...agents.state import AgentState, StateNode, append_user_clarification
 from ...memory.hybrid_memory import HybridMemory
+from ..dependencies import get_memory, get_session_store
+from ..session_store import SessionStore
 
 router = APIRouter()
 
-# In-memory session storage (use Redis in production)
-sessions: Dict[str, AgentState] = {}
-# Session metadata for TTL management
-session_metadata: Dict[str, Dict[str, Any]] = {}
-# Per-session locks to serialize requests for same session while allowing concurrent sessions
-session_locks: Dict[str, asyncio.Lock] = {}
-# Global lock for managing session_locks dict
-_locks_lock = asyncio.Lock()
-# Session TTL (30 minutes)
-SESSION_TTL = timedelta(minutes=30)
-
-
-async def get_or_create_session_lock(session_id: str) -> asyncio.Lock:
-    """Get or create a lock for a session, ensuring atomicity."""
-    # Keep the lock reference while protected by _locks_lock
-    # This prevents the TOCTOU race condition
-    async with _locks_lock:
-        if session_id not in session_locks:
-            session_locks[session_id] = asyncio.Lock()
-        # Return the lock while still holding _locks_lock
-        # The lock object itself is thread-safe to acquire after this
-        return session_locks[session_id]
-
-
-async def cleanup_expired_sessions():
-    """Remove expired sessions and their locks."""
-    async with _locks_lock:
-        now = datetime.now()
-        expired = [
-            sid for sid, meta in session_metadata.items()
-            if now - meta["last_access"] > SESSION_TTL
-        ]
-        for sid in expired:
-            sessions.pop(sid, None)
-            session_locks.pop(sid, None)
-            session_metadata.pop(sid, None)
-
-        if expired:
-            print(f"🧹 Cleaned up {len(expired)} expired sessions")
+# Times a request re-runs the agents when its commit loses a race
+MAX_COMMIT_ATTEMPTS = 3
+
+# Offline agents hold no per-request state, so one instance serves all requests
+_SCANNER = AmbiguityScanner(use_llm=False)
+_INTERROGATOR = SocraticInterrogator(use_llm=False)
 
 
 class ProcessRequest(BaseModel):
@@ -65,61 +34,43 @@ class ProcessResponse(BaseModel):
 
 
 @router.post("/process", response_model=ProcessResponse)
-async def process_input(request: ProcessRequest):
+async def process_input(
+    request: ProcessRequest,
+    store: SessionStore = Depends(get_session_store),
+    memory: HybridMemory = Depends(get_memory)
+):
     """Process user input through cognitive graph"""
 
-    # Periodically cleanup expired sessions (every ~100 requests)
-    import random
-    if random.random() < 0.01:
-        await cleanup_expired_sessions()
-
-    # Get session lock atomically (fixes TOCTOU race condition)
-    session_lock = await get_or_create_session_lock(request.session_id)
-
-    # Hold the session-specific lock for the entire operation
-    # This serializes requests for the same session while allowing different sessions concurrently
-    async with session_lock:
-        # Get or create session
-        if request.session_id not in sessions:
-            state = AgentState(
-                current_node=StateNode.AMBIGUITY_SCANNER,
-                user_input=request.input,
-                conversation_history=[]
-            )
-            sessions[request.session_id] = state
-            session_metadata[request.session_id] = {
-                "created": datetime.now(),
-                "last_access": datetime.now()
-            }
-        else:
-            state = sessions[request.session_id]
-            state.user_input = request.input
-            # Update last access time
-            session_metadata[request.session_id]["last_access"] = datetime.now()
-
-        # Run through graph
-        graph = CognitiveGraph()
-        memory = HybridMemory()
+    # The session lock is only held to load and to commit state, never
+    # across agent (LLM) calls. A commit that finds the session moved on
+    # since it was loaded re-runs the agents on the newer state.
+    for _ in range(MAX_COMMIT_ATTEMPTS):
+        async with store.lock(request.session_id):
+            state = await _load_session(store, request)
+        base_version = state.version
 
         try:
-            # Initialize memory inside try block (fixes resource leak)
-            await memory.initialize()
-
-            # Run ambiguity scanner (all state mutations protected by session lock)
-            from ...agents.nodes.ambiguity_scanner import AmbiguityScanner
-            scanner = AmbiguityScanner(use_llm=False)
-            state = await scanner.analyze(state)
+            # Run ambiguity scanner (state is our own copy, no lock needed)
+            # alongside episodic retrieval; the two are independent
+            state, episodes = await asyncio.gather(
+                _SCANNER.analyze(state),
+                memory.retrieve_episodic(request.input, k=5)
+            )
 
             # If high ambiguity, run interrogator
             questions = None
             if state.ambiguity_score > 0.7:
-                from ...agents.nodes.socratic_interrogator import SocraticInterrogator
-                interrogator = SocraticInterrogator(use_llm=False)
-                state = await interrogator.generate_questions(state)
+                state = await _INTERROGATOR.generate_questions(state, episodes)
                 questions = state.conversation_history[-1].get("questions", [])
 
-            # Store updated state
-            sessions[request.session_id] = state
+            # Store updated state (restarts the session TTL) unless another
+            # request committed first
+            async with store.lock(request.session_id):
+                current = await store.get(request.session_id)
+                if (current.version if current else 0) != base_version:
+                    continue
+                state.version = base_version + 1
+                await store.set(request.session_id, state)
 
             return ProcessResponse(
                 session_id=request.session_id,
@@ -130,6 +81,21 @@ async def process_input(request: ProcessRequest):
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
-        finally:
-            # Always close memory connections, even if initialization fails
-            await memory.close()
+
+    raise HTTPException(status_code=409, detail="Session was updated concurrently, please retry")
+
+
+async def _load_session(store: SessionStore, request: ProcessRequest) -> AgentState:
+    """Get or create the session state, with the request input applied"""
+    state = await store.get(request.session_id)
+    if state is None:
+        return AgentState(
+            current_node=StateNode.AMBIGUITY_SCANNER,
+            user_input=request.input,
+            conversation_history=[]
+        )
+
+    state.user_input = request.input
+    # Follow-up input on an existing session answers earlier questions
+    append_user_clarification(state, request.input)
+    return state
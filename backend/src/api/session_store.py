@@ -0,0 +1,144 @@
+import asyncio
+import heapq
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from ..agents.state import AgentState
+
+# Session TTL (30 minutes)
+SESSION_TTL_SECONDS = 30 * 60
+
+# Per-session lock lease. The lock only covers loading or committing a
+# state (LLM calls run outside it), so a few seconds is ample, and a crashed
+# worker can't wedge the session for long
+LOCK_TTL_MS = 5_000
+LOCK_RETRY_SECONDS = 0.05
+
+# How often the in-memory fallback sweeps expired sessions
+PURGE_INTERVAL_SECONDS = 60
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SessionStore:
+    """
+    Agent session state keyed by session id.
+
+    Backed by Redis so sessions are shared across workers and expire via
+    SETEX. For testing without Redis, uses in-memory storage.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Any] = None,
+        use_memory: bool = True,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.config = config
+        self.use_memory = use_memory
+        self.clock = clock
+        self.redis = None
+
+        # In-memory storage for testing: session id -> (state JSON, deadline)
+        self._sessions: Dict[str, Tuple[str, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # (deadline, session id) min-heap; an entry is stale once the session
+        # has been written again with a later deadline
+        self._expiry: List[Tuple[float, str]] = []
+
+    async def connect(self):
+        """Initialize connections"""
+        if not self.use_memory:
+            try:
+                from redis.asyncio import Redis
+                from ..core.config import get_config
+
+                self.config = self.config or get_config()
+
+                self.redis = Redis.from_url(self.config.redis_url)
+                await self.redis.ping()
+            except Exception as e:
+                # Fall back to in-memory if connection fails
+                self.use_memory = True
+                self.redis = None
+                print(f"Falling back to in-memory sessions: {e}")
+
+    async def get(self, session_id: str) -> Optional[AgentState]:
+        """Load a session's state, or None if absent or expired"""
+        if self.use_memory:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[1] < self.clock():
+                return None
+            data = entry[0]
+        else:
+            data = await self.redis.get(self._key(session_id))
+            if data is None:
+                return None
+        return AgentState.model_validate_json(data)
+
+    async def set(self, session_id: str, state: AgentState):
+        """Store a session's state and restart its TTL"""
+        data = state.model_dump_json()
+        if self.use_memory:
+            deadline = self.clock() + SESSION_TTL_SECONDS
+            self._sessions[session_id] = (data, deadline)
+            heapq.heappush(self._expiry, (deadline, session_id))
+        else:
+            await self.redis.set(self._key(session_id), data, ex=SESSION_TTL_SECONDS)
+
+    async def run_purge_loop(self):
+        """Sweep expired in-memory sessions until cancelled; Redis expires its own keys"""
+        while self.use_memory:
+            await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+            self.purge_expired()
+
+    def purge_expired(self):
+        """Drop expired in-memory sessions and their idle locks"""
+        now = self.clock()
+        # Only pops due heap entries, so each sweep is O(expired * log n)
+        while self._expiry and self._expiry[0][0] < now:
+            _, sid = heapq.heappop(self._expiry)
+            entry = self._sessions.get(sid)
+            # Touched since this entry was pushed: a later one covers it
+            if entry is None or entry[1] >= now:
+                continue
+            del self._sessions[sid]
+            lock = self._locks.get(sid)
+            if lock is not None and not lock.locked():
+                del self._locks[sid]
+
+    @asynccontextmanager
+    async def lock(self, session_id: str) -> AsyncIterator[None]:
+        """Serialize requests for the same session while allowing different sessions concurrently"""
+        if self.use_memory:
+            # No await between lookup and insert, so no other coroutine on
+            # this loop can race us; no guard lock needed
+            async with self._locks.setdefault(session_id, asyncio.Lock()):
+                yield
+            return
+
+        # SET NX PX lease; the token makes sure we only release our own lock
+        key = f"sess:lock:{session_id}"
+        token = uuid.uuid4().hex
+        while not await self.redis.set(key, token, nx=True, px=LOCK_TTL_MS):
+            await asyncio.sleep(LOCK_RETRY_SECONDS)
+        try:
+            yield
+        finally:
+            await self.redis.eval(_RELEASE_LOCK, 1, key, token)
+
+    async def close(self):
+        """Close connections"""
+        if self.redis:
+            await self.redis.aclose()
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"sess:{session_id}"
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -9,7 +10,15 @@ class AppConfig(BaseSettings):
     neo4j_uri: str = "bolt://localhost:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str
+    # Sessions are kept in memory unless this is set
+    redis_url: Optional[str] = None
 
     class Config:
         env_file = ".env"
         case_sensitive = False
+
+
+@lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """Process-wide settings; .env is read once, on first use"""
+    return AppConfig()
@@ -0,0 +1 @@
+# LLM clients module initialization
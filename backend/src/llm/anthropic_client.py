@@ -0,0 +1,25 @@
+from functools import lru_cache
+from typing import Optional
+from langchain_anthropic import ChatAnthropic
+
+DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+
+
+def get_shared_llm(model: str = DEFAULT_MODEL, temperature: Optional[float] = None) -> ChatAnthropic:
+    """
+    Return the process-wide ChatAnthropic client for a model and temperature.
+
+    Sampling parameters are set on the client rather than through
+    `.bind(temperature=...)`: the pinned langchain-anthropic builds each
+    request from the client's own fields and drops call kwargs. Agents that
+    share a temperature (e.g. two at 0.4) share one client and its HTTP
+    connection pool.
+    """
+    return _client_for(model, temperature)
+
+
+@lru_cache(maxsize=None)
+def _client_for(model: str, temperature: Optional[float]) -> ChatAnthropic:
+    if temperature is None:
+        return ChatAnthropic(model=model)
+    return ChatAnthropic(model=model, temperature=temperature)
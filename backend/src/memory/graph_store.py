@@ -1,6 +1,90 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, AsyncIterator, Optional, List, Tuple
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
+import asyncio
 import uuid
+import numpy as np
+
+# Relationship types that make the source a dependency of the target
+_DEP_TYPES = frozenset({"BLOCKS", "DEPENDS_ON", "PRECEDES"})
+
+# Neo4j counterpart, built from the same set. Like the in-memory lookup it
+# follows edges INTO the entity: in (a)-[:BLOCKS]->(b), a is b's dependency
+_DEPENDENCIES_QUERY = f"""
+MATCH (dep)-[r:{"|".join(sorted(_DEP_TYPES))}]->(e)
+WHERE e.id = $entity_id
+AND (r.valid_until IS NULL OR r.valid_until > datetime())
+RETURN dep, r
+"""
+
+# Longest dependency chain followed, in hops. Keeps the Neo4j
+# variable-length match from enumerating unbounded paths on dense graphs
+MAX_CHAIN_DEPTH = 8
+
+# Transitive version: every dependency within MAX_CHAIN_DEPTH hops through
+# live edges, nearest first, each with the edge that reaches it on its
+# shortest path
+_DEPENDENCY_CHAIN_QUERY = f"""
+MATCH p = (e)<-[:{"|".join(sorted(_DEP_TYPES))}*1..{MAX_CHAIN_DEPTH}]-(dep)
+WHERE e.id = $entity_id AND dep <> e
+AND all(r IN relationships(p) WHERE r.valid_until IS NULL OR r.valid_until > datetime())
+WITH dep, p ORDER BY length(p)
+WITH dep, collect(p)[0] AS p
+RETURN dep, last(relationships(p)) AS r
+ORDER BY length(p)
+"""
+
+_NAT = np.datetime64("NaT", "s")
+
+# Graph store -> (session, owning task) for the session() blocks the
+# current context is inside. Replaced, never mutated, so reset() restores it
+_ACTIVE_SESSIONS: ContextVar[Dict[Any, Tuple[Any, Any]]] = ContextVar(
+    "neo4j_active_sessions", default={}
+)
+
+
+def _as_datetime64(value: Any) -> np.datetime64:
+    """Parse a date-like property into a datetime64, NaT if absent or invalid"""
+    if value is None:
+        return _NAT
+    try:
+        return np.datetime64(value, "s")
+    except (TypeError, ValueError):
+        return _NAT
+
+
+class _EntityColumns:
+    """
+    Columnar (struct-of-arrays) view of one entity type, so bulk filters
+    run as NumPy masks instead of per-dict lookups. Buffers grow by
+    doubling; only the first `size` slots are live.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=object)
+        self.deadlines = np.full(capacity, _NAT)
+
+    def append(self, entity_id: str, deadline: Any):
+        if self.size == len(self.ids):
+            self.ids = np.concatenate([self.ids, np.empty(self.size, dtype=object)])
+            self.deadlines = np.concatenate([self.deadlines, np.full(self.size, _NAT)])
+        self.ids[self.size] = entity_id
+        self.deadlines[self.size] = _as_datetime64(deadline)
+        self.size += 1
+
+    def ids_with_deadline_before(self, before: np.datetime64) -> np.ndarray:
+        # NaT compares False, so entities without a deadline drop out
+        return self.ids[:self.size][self.deadlines[:self.size] < before]
+
+
+async def _run_query(tx: Any, query: str, params: Dict[str, Any]) -> List[List[Any]]:
+    # Transaction function: results must be consumed inside the transaction
+    result = await tx.run(query, **params)
+    return await result.values()
+
 
 class TemporalKnowledgeGraph:
     """
@@ -17,6 +101,11 @@ class TemporalKnowledgeGraph:
         # In-memory storage for testing
         self.entities: Dict[str, Dict[str, Any]] = {}
         self.relationships: List[Dict[str, Any]] = []
+        # Relationships by target entity id, so dependency lookups only
+        # touch the entity's own incoming edges
+        self._by_to: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # Per-type columns for bulk queries; entity dicts stay authoritative
+        self._columns: Dict[str, _EntityColumns] = defaultdict(_EntityColumns)
         self.driver = None
 
     async def connect(self):
@@ -24,14 +113,14 @@ class TemporalKnowledgeGraph:
         if not self.use_memory:
             try:
                 from neo4j import AsyncGraphDatabase
-                from ..core.config import AppConfig
+                from ..core.config import get_config
 
-                if not self.config:
-                    self.config = AppConfig()
+                self.config = self.config or get_config()
 
                 self.driver = AsyncGraphDatabase.driver(
                     self.config.neo4j_uri,
-                    auth=(self.config.neo4j_user, self.config.neo4j_password)
+                    auth=(self.config.neo4j_user, self.config.neo4j_password),
+                    max_connection_pool_size=50
                 )
             except Exception as e:
                 # Fall back to in-memory if connection fails
@@ -55,20 +144,19 @@ class TemporalKnowledgeGraph:
                 **properties
             }
             self.entities[entity_id] = entity
+            self._columns[entity_type].append(entity_id, properties.get("deadline"))
             return entity
         else:
             # Neo4j implementation
-            async with self.driver.session() as session:
-                query = f"""
-                CREATE (e:{entity_type})
-                SET e = $properties
-                SET e.created_at = datetime()
-                SET e.id = randomUUID()
-                RETURN e
-                """
-                result = await session.run(query, properties=properties)
-                record = await result.single()
-                return dict(record["e"])
+            query = f"""
+            CREATE (e:{entity_type})
+            SET e = $properties
+            SET e.created_at = datetime()
+            SET e.id = randomUUID()
+            RETURN e
+            """
+            records = await self._write(query, properties=properties)
+            return dict(records[0][0])
 
     async def create_relationship(
         self,
@@ -94,25 +182,87 @@ class TemporalKnowledgeGraph:
                 **properties
             }
             self.relationships.append(relationship)
+            self._by_to[relationship["to_id"]].append(relationship)
             return relationship
         else:
             # Neo4j implementation
-            async with self.driver.session() as session:
-                query = f"""
-                MATCH (from) WHERE from.id = $from_id
-                MATCH (to) WHERE to.id = $to_id
-                CREATE (from)-[r:{rel_type}]->(to)
-                SET r = $properties
-                RETURN r
-                """
-                result = await session.run(
-                    query,
-                    from_id=from_entity["id"],
-                    to_id=to_entity["id"],
-                    properties=properties
+            query = f"""
+            MATCH (from) WHERE from.id = $from_id
+            MATCH (to) WHERE to.id = $to_id
+            CREATE (from)-[r:{rel_type}]->(to)
+            SET r = $properties
+            RETURN r
+            """
+            records = await self._write(
+                query,
+                from_id=from_entity["id"],
+                to_id=to_entity["id"],
+                properties=properties
+            )
+            return {"type": rel_type, **dict(records[0][0])}
+
+    async def create_entities_bulk(
+        self,
+        entity_type: str,
+        rows: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Create many entity nodes of one type in a single round trip"""
+
+        if self.use_memory:
+            # In-memory implementation
+            return [await self.create_entity(entity_type, properties) for properties in rows]
+        else:
+            # Neo4j implementation: one UNWIND instead of a query per entity
+            query = f"""
+            UNWIND $rows AS row
+            CREATE (e:{entity_type})
+            SET e = row
+            SET e.created_at = datetime()
+            SET e.id = randomUUID()
+            RETURN e
+            """
+            records = await self._write(query, rows=rows)
+            return [dict(record[0]) for record in records]
+
+    async def create_relationships_bulk(
+        self,
+        rel_type: str,
+        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        properties: Optional[Dict[str, Any]] = None,
+        valid_from: Optional[datetime] = None,
+        valid_until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Create temporal relationships of one type between many entity pairs"""
+
+        if self.use_memory:
+            # In-memory implementation
+            return [
+                await self.create_relationship(
+                    from_entity, rel_type, to_entity, dict(properties or {}), valid_from, valid_until
                 )
-                record = await result.single()
-                return {"type": rel_type, **dict(record["r"])}
+                for from_entity, to_entity in pairs
+            ]
+        else:
+            properties = dict(properties or {})
+            properties["valid_from"] = (valid_from or datetime.now()).isoformat()
+            if valid_until:
+                properties["valid_until"] = valid_until.isoformat()
+
+            # Neo4j implementation: one UNWIND instead of a query per pair
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (from) WHERE from.id = row.from_id
+            MATCH (to) WHERE to.id = row.to_id
+            CREATE (from)-[r:{rel_type}]->(to)
+            SET r = $properties
+            RETURN r
+            """
+            records = await self._write(
+                query,
+                rows=[{"from_id": f["id"], "to_id": t["id"]} for f, t in pairs],
+                properties=properties
+            )
+            return [{"type": rel_type, **dict(record[0])} for record in records]
 
     async def query_dependencies(self, entity_id: str) -> list:
         """Find all entities this entity depends on"""
@@ -120,25 +270,94 @@ class TemporalKnowledgeGraph:
         if self.use_memory:
             # In-memory implementation
             deps = []
-            for rel in self.relationships:
-                # Look for relationships pointing TO this entity (predecessors/dependencies)
-                if rel["to_id"] == entity_id and rel["type"] in ["BLOCKS", "DEPENDS_ON", "PRECEDES"]:
+            # Relationships pointing TO this entity (predecessors/dependencies)
+            for rel in self._by_to.get(entity_id, ()):
+                if rel["type"] in _DEP_TYPES:
                     from_entity = self.entities.get(rel["from_id"])
                     if from_entity:
                         deps.append((from_entity, rel))
             return deps
         else:
             # Neo4j implementation
-            async with self.driver.session() as session:
-                query = """
-                MATCH (e)-[r:BLOCKS|DEPENDS_ON]->(dep)
-                WHERE e.id = $entity_id
-                AND (r.valid_until IS NULL OR r.valid_until > datetime())
-                RETURN dep, r
-                """
-                result = await session.run(query, entity_id=entity_id)
-                records = await result.values()
-                return records
+            return await self._read(_DEPENDENCIES_QUERY, entity_id=entity_id)
+
+    async def query_dependency_chain(self, entity_id: str) -> list:
+        """Find all entities this entity depends on, directly or transitively"""
+
+        if self.use_memory:
+            # In-memory implementation: iterative BFS over the incoming-edge
+            # index, nearest dependencies first; `seen` guards against cycles
+            chain = []
+            seen = {entity_id}
+            frontier = deque([(entity_id, 0)])
+            while frontier:
+                node_id, depth = frontier.popleft()
+                if depth == MAX_CHAIN_DEPTH:
+                    continue
+                for rel in self._by_to.get(node_id, ()):
+                    dep_id = rel["from_id"]
+                    if rel["type"] not in _DEP_TYPES or dep_id in seen:
+                        continue
+                    seen.add(dep_id)
+                    from_entity = self.entities.get(dep_id)
+                    if from_entity:
+                        chain.append((from_entity, rel))
+                        frontier.append((dep_id, depth + 1))
+            return chain
+        else:
+            # Neo4j implementation: one variable-length match, not a query per hop
+            return await self._read(_DEPENDENCY_CHAIN_QUERY, entity_id=entity_id)
+
+    async def query_entities_by_deadline(self, entity_type: str, before: datetime) -> List[Dict[str, Any]]:
+        """Find entities of a type whose deadline falls before the given time"""
+
+        if self.use_memory:
+            # In-memory implementation: one vectorized comparison per type
+            columns = self._columns.get(entity_type)
+            if columns is None:
+                return []
+            ids = columns.ids_with_deadline_before(_as_datetime64(before))
+            return [self.entities[entity_id] for entity_id in ids]
+        else:
+            # Neo4j implementation
+            query = f"""
+            MATCH (e:{entity_type})
+            WHERE e.deadline IS NOT NULL AND datetime(e.deadline) < datetime($before)
+            RETURN e
+            """
+            records = await self._read(query, before=before.isoformat())
+            return [dict(record[0]) for record in records]
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Any]:
+        """
+        Share one Neo4j session across every graph call made by the current
+        task inside this block, e.g. the writes of a single request.
+        Sessions are not safe for concurrent use, so other tasks (including
+        ones spawned inside the block) still open their own.
+        """
+        active = _ACTIVE_SESSIONS.get()
+        session, task = active.get(self, (None, None))
+        if self.use_memory or (session is not None and task is asyncio.current_task()):
+            yield session
+            return
+
+        async with self.driver.session() as session:
+            token = _ACTIVE_SESSIONS.set({**active, self: (session, asyncio.current_task())})
+            try:
+                yield session
+            finally:
+                _ACTIVE_SESSIONS.reset(token)
+
+    async def _write(self, query: str, **params: Any) -> List[List[Any]]:
+        """Run a write as a managed transaction, retried on transient errors"""
+        async with self.session() as session:
+            return await session.execute_write(_run_query, query, params)
+
+    async def _read(self, query: str, **params: Any) -> List[List[Any]]:
+        """Run a read as a managed transaction, retried on transient errors"""
+        async with self.session() as session:
+            return await session.execute_read(_run_query, query, params)
 
     async def close(self):
         """Close connections"""
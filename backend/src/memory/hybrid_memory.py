@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from .vector_store import EpisodicMemory
 from .graph_store import TemporalKnowledgeGraph
 
@@ -12,15 +12,20 @@ class HybridMemory:
     def __init__(self):
         self.episodic = EpisodicMemory()
         self.semantic = TemporalKnowledgeGraph()
+        # Bumped on every episodic write so callers can invalidate caches
+        self.episodic_version = 0
 
     async def initialize(self):
         """Initialize both memory systems"""
+        await self.episodic.connect()
         await self.semantic.connect()
 
     # Episodic operations
     async def store_episodic(self, content: str, metadata: Optional[Dict] = None):
         """Store conversational memory"""
-        await self.episodic.store(content, metadata)
+        # Repeats are skipped, and leave dependent caches valid
+        if await self.episodic.store(content, metadata):
+            self.episodic_version += 1
 
     async def retrieve_episodic(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Retrieve similar conversations"""
@@ -43,10 +48,47 @@ class HybridMemory:
             from_entity, rel_type, to_entity, properties
         )
 
+    async def store_semantic_entities(self, entity_type: str, rows: List[Dict]) -> List[Dict]:
+        """Store many structured entities of one type at once"""
+        return await self.semantic.create_entities_bulk(entity_type, rows)
+
+    async def store_semantic_relationships(
+        self,
+        rel_type: str,
+        pairs: List[Tuple[Dict, Dict]],
+        properties: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Store many structured relationships of one type at once"""
+        return await self.semantic.create_relationships_bulk(rel_type, pairs, properties)
+
+    async def store_semantic_bulk(
+        self,
+        entity_type: str,
+        rows: List[Dict],
+        rel_type: Optional[str] = None,
+        links: Sequence[Tuple[int, int]] = ()
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Store entities of one type and the relationships between them.
+
+        `links` are (from, to) index pairs into `rows`. Both writes run as
+        UNWIND batches on one shared session: two queries in total, however
+        many entities and relationships.
+        """
+        async with self.semantic.session():
+            entities = await self.semantic.create_entities_bulk(entity_type, rows)
+            relationships = []
+            if rel_type and links:
+                relationships = await self.semantic.create_relationships_bulk(
+                    rel_type, [(entities[i], entities[j]) for i, j in links]
+                )
+        return entities, relationships
+
     async def get_causal_chain(self, entity_id: str) -> List[Dict]:
-        """Get dependency chain for entity"""
-        return await self.semantic.query_dependencies(entity_id)
+        """Get dependency chain for entity, including transitive dependencies"""
+        return await self.semantic.query_dependency_chain(entity_id)
 
     async def close(self):
         """Cleanup connections"""
+        await self.episodic.close()
         await self.semantic.close()
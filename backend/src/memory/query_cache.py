@@ -0,0 +1,70 @@
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import time
+
+
+class QueryCache:
+    """
+    Exact-match cache for retrieval results.
+
+    Entries are keyed on a digest of the query text, expire after `ttl`
+    seconds, and the least recently used entry is evicted once `capacity`
+    is reached. Owners should call `clear()` when the underlying memory
+    changes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        capacity: int = 256,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.clock = clock
+
+        # text digest -> (payload, stored_at)
+        self._entries: "OrderedDict[bytes, Tuple[Any, float]]" = OrderedDict()
+
+    def get(self, text: str) -> Optional[Any]:
+        """Return the cached payload for text, if present and fresh"""
+        key = self._key(text)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        payload, stored_at = entry
+        if self.clock() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, text: str, payload: Any):
+        """Cache payload for text, evicting the least recently used entry if full"""
+        key = self._key(text)
+        self._entries[key] = (payload, self.clock())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, text: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached payload, or await compute() and cache its result"""
+        payload = self.get(text)
+        if payload is None:
+            payload = await compute()
+            self.put(text, payload)
+        return payload
+
+    def clear(self):
+        """Drop all entries (e.g. after the underlying memory changes)"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
@@ -1,22 +1,150 @@
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
+import asyncio
+import functools
+import hashlib
 import uuid
+import numpy as np
+from scipy import sparse
+
+@functools.lru_cache(maxsize=None)
+def _load_encoder(model_name: str, file_name: str) -> Any:
+    """Load a sentence-transformer once per process; every EpisodicMemory
+    (the API's, the council's) shares it instead of reloading the weights"""
+    from sentence_transformers import SentenceTransformer
+
+    encoder = SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": file_name})
+    # The first ONNX Runtime pass sets up kernels and buffers; pay for it at
+    # startup rather than on the first user query
+    encoder.encode(["warmup"], normalize_embeddings=True, convert_to_numpy=True)
+    return encoder
+
+
+class _EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into one model call.
+
+    Callers await embed(texts); a background task takes the first waiting
+    request, gives others WINDOW seconds to arrive, then encodes up to
+    MAX_BATCH texts in a single forward pass and hands each caller its rows.
+    """
+
+    MAX_BATCH = 64
+    WINDOW = 0.002
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray]):
+        self.encode = encode
+        self._queue: "asyncio.Queue[Tuple[List[str], asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Nagle-style window so near-simultaneous requests share a pass
+            await asyncio.sleep(self.WINDOW)
+            size = len(batch[0][0])
+            while size < self.MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                size += len(batch[-1][0])
+
+            try:
+                # Model inference is CPU-bound; keep it off the event loop
+                vectors = await asyncio.to_thread(self.encode, [t for texts, _ in batch for t in texts])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(texts)])
+                offset += len(texts)
+
 
 class EpisodicMemory:
     """Vector-based episodic memory for conversation history
 
-    Uses in-memory storage for testing. In production, would use
-    Chroma or another vector database with proper embeddings.
+    Uses in-memory keyword storage for testing. With use_memory=False,
+    documents are embedded with a quantized sentence-transformer and
+    searched through an HNSW index (hnswlib).
     """
 
+    # Buffered documents appended to the term-document matrix (or embedded
+    # and added to the HNSW index) at once
+    FLUSH_EVERY = 256
+
+    # all-MiniLM-L6-v2 through ONNX Runtime with its int8 weights
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_FILE = "onnx/model_quint8_avx2.onnx"
+    EMBEDDING_DIM = 384
+
+    # HNSW build/search parameters; the index grows by doubling
+    HNSW_M = 16
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = 64
+    HNSW_INITIAL_CAPACITY = 1024
+
     def __init__(self, collection_name: str = "rpd_episodes", use_memory: bool = True):
         self.collection_name = collection_name
         self.use_memory = use_memory
 
         # In-memory storage for testing
         self.documents: List[Dict[str, Any]] = []
+        # Content digests of stored documents, to skip exact repeats
+        self._seen: Set[bytes] = set()
+
+        # Binary term-document matrix (one row per document) so a query is
+        # scored against every document with a single sparse mat-vec.
+        # New rows are buffered and appended in blocks.
+        self._vocab: Dict[str, int] = {}
+        self._tdm = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._pending_rows: List[List[int]] = []
+
+        # HNSW index over document embeddings (set up in connect)
+        self._encoder = None
+        self._index = None
+        self._pending_embed: List[int] = []
+        self._batcher = _EmbeddingBatcher(self._embed)
+
+    async def connect(self):
+        """Initialize the embedding model and ANN index"""
+        # HybridMemory.initialize runs on every council deliberation; a new
+        # index would drop every stored episode
+        if not self.use_memory and self._index is None:
+            try:
+                import hnswlib
+
+                self._encoder = await asyncio.to_thread(
+                    _load_encoder, self.EMBEDDING_MODEL, self.EMBEDDING_FILE
+                )
+                self._index = self._new_index(hnswlib)
+            except Exception as e:
+                # Fall back to in-memory keyword search if unavailable
+                self.use_memory = True
+                self._encoder = None
+                self._index = None
+                print(f"Falling back to in-memory episodic search: {e}")
+
+    async def store(self, content: str, metadata: Optional[Dict] = None) -> bool:
+        """Store episodic memory; returns False if identical content is already stored"""
+        digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        if digest in self._seen:
+            return False
+        self._seen.add(digest)
 
-    async def store(self, content: str, metadata: Optional[Dict] = None):
-        """Store episodic memory"""
         doc = {
             "id": str(uuid.uuid4()),
             "content": content,
@@ -24,28 +152,119 @@ class EpisodicMemory:
         }
         self.documents.append(doc)
 
+        if not self.use_memory:
+            # Embedding is far cheaper per document in batches
+            self._pending_embed.append(len(self.documents) - 1)
+            if len(self._pending_embed) >= self.FLUSH_EVERY:
+                await self._flush_embeddings()
+            return True
+
+        terms = set(content.lower().split())
+        self._pending_rows.append([self._vocab.setdefault(t, len(self._vocab)) for t in terms])
+        if len(self._pending_rows) >= self.FLUSH_EVERY:
+            self._flush()
+        return True
+
     async def retrieve(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Retrieve similar episodes
 
-        For testing, does simple keyword matching.
-        In production, would use vector similarity search.
+        For testing, does simple keyword matching; otherwise
+        approximate nearest-neighbour search over embeddings.
         """
-        # Simple keyword-based retrieval for testing
-        query_words = set(query.lower().split())
+        if not self.use_memory:
+            return await self._retrieve_nearest(query, k)
+
+        # Simple keyword-based retrieval for testing: score = number of
+        # distinct query words the document contains
+        self._flush()
+        term_ids = {self._vocab[w] for w in query.lower().split() if w in self._vocab}
+        if not term_ids or k <= 0:
+            return []
+
+        query_vec = np.zeros(len(self._vocab), dtype=np.int32)
+        query_vec[list(term_ids)] = 1
+        scores = self._tdm @ query_vec
+
+        hits = np.flatnonzero(scores)
+        hit_scores = scores[hits]
+        if len(hits) > k:
+            # O(N) selection of the k best instead of sorting every hit. Keep
+            # everything above the k-th best score, then fill up with the
+            # earliest-stored documents tied at it, as a stable sort would.
+            kth = np.partition(hit_scores, len(hits) - k)[len(hits) - k]
+            above = hit_scores > kth
+            tied = np.flatnonzero(hit_scores == kth)[:k - np.count_nonzero(above)]
+            keep = np.sort(np.concatenate([np.flatnonzero(above), tied]))
+            hits, hit_scores = hits[keep], hit_scores[keep]
+
+        # Best first; stable so ties keep insertion order
+        top = hits[np.argsort(-hit_scores, kind="stable")]
+
+        return [
+            {"content": self.documents[i]["content"], "metadata": self.documents[i]["metadata"]}
+            for i in top
+        ]
+
+    def _flush(self):
+        """Append buffered document rows to the term-document matrix"""
+        if not self._pending_rows:
+            return
 
-        scored_docs = []
-        for doc in self.documents:
-            content_words = set(doc["content"].lower().split())
-            # Calculate simple overlap score
-            overlap = len(query_words & content_words)
-            if overlap > 0:
-                scored_docs.append((overlap, doc))
+        rows = self._pending_rows
+        self._pending_rows = []
+        indptr = np.cumsum([0] + [len(r) for r in rows])
+        indices = np.fromiter((t for r in rows for t in r), dtype=np.int32, count=indptr[-1])
+        block = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(rows), len(self._vocab))
+        )
 
-        # Sort by score descending
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
+        # Earlier rows just gain empty columns for newly seen terms
+        self._tdm.resize((self._tdm.shape[0], len(self._vocab)))
+        self._tdm = sparse.vstack([self._tdm, block], format="csr")
 
-        # Return top k documents
+    async def _retrieve_nearest(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """Top-k documents by cosine similarity from the HNSW index"""
+        await self._flush_embeddings()
+        k = min(k, self._index.get_current_count())
+        if k <= 0:
+            return []
+
+        query_vec = await self._batcher.embed([query])
+        labels, _ = self._index.knn_query(query_vec, k=k)
         return [
-            {"content": doc["content"], "metadata": doc["metadata"]}
-            for _, doc in scored_docs[:k]
+            {"content": self.documents[i]["content"], "metadata": self.documents[i]["metadata"]}
+            for i in labels[0]
         ]
+
+    async def _flush_embeddings(self):
+        """Embed buffered documents and add them to the HNSW index"""
+        if not self._pending_embed:
+            return
+
+        ids = self._pending_embed
+        self._pending_embed = []
+        vectors = await self._batcher.embed([self.documents[i]["content"] for i in ids])
+
+        needed = self._index.get_current_count() + len(ids)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        self._index.add_items(vectors, np.asarray(ids))
+
+    async def close(self):
+        """Stop the embedding batcher"""
+        await self._batcher.close()
+
+    def _new_index(self, hnswlib: Any) -> Any:
+        index = hnswlib.Index(space="ip", dim=self.EMBEDDING_DIM)
+        index.init_index(
+            max_elements=self.HNSW_INITIAL_CAPACITY,
+            M=self.HNSW_M,
+            ef_construction=self.HNSW_EF_CONSTRUCTION
+        )
+        index.set_ef(self.HNSW_EF_SEARCH)
+        return index
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        # Unit-length vectors, so inner product ("ip" space) is cosine similarity
+        return self._encoder.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
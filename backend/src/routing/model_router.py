@@ -1,5 +1,9 @@
+import asyncio
+from contextlib import asynccontextmanager
 from enum import Enum
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
 
 class TaskType(str, Enum):
     AMBIGUITY_SCAN = "ambiguity_scan"
@@ -29,6 +33,17 @@ class ModelRouter:
         "gemini-2.0-flash-exp": 0.0,            # Free tier
     }
 
+    # Max in-flight requests per model, so gather()ed calls queue here
+    # rather than tripping provider rate limits (429s and retry storms)
+    MODEL_CONCURRENCY = {
+        "claude-3-5-sonnet-20241022": 8,
+        "claude-3-haiku-20240307": 16,
+        "gpt-4o": 8,
+        "gpt-4o-mini": 16,
+        "gemini-2.0-flash-exp": 4,              # Free tier is tightly limited
+    }
+    DEFAULT_CONCURRENCY = 4
+
     # Model capabilities by task type
     TASK_MODELS = {
         TaskType.AMBIGUITY_SCAN: {
@@ -57,6 +72,9 @@ class ModelRouter:
         }
     }
 
+    # Complexity bands select_model distinguishes
+    BANDS = ("low", "medium", "high")
+
     def __init__(self, cost_threshold: Optional[float] = None):
         """
         Initialize router with optional cost threshold.
@@ -66,6 +84,19 @@ class ModelRouter:
         """
         self.cost_threshold = cost_threshold
 
+        # Every decision the router can make, per task and complexity band,
+        # so select_model is a pair of dict lookups. _select is shared across
+        # routers with the same threshold, so building this is cheap too.
+        self._choices: Dict[TaskType, Dict[str, str]] = {
+            task_type: {band: self._select(task_type, band, cost_threshold) for band in self.BANDS}
+            for task_type in self.TASK_MODELS
+        }
+
+        # Admission control per model, shared by every caller of this router
+        self._semaphores: Dict[str, asyncio.Semaphore] = {
+            model: asyncio.Semaphore(limit) for model, limit in self.MODEL_CONCURRENCY.items()
+        }
+
     def select_model(
         self,
         task_type: TaskType,
@@ -83,22 +114,38 @@ class ModelRouter:
         Returns:
             Model identifier string
         """
-        candidates = self.TASK_MODELS.get(task_type, {})
+        # Only the complexity band affects the choice
+        if complexity_score > 0.8:
+            band = "high"
+        elif complexity_score < 0.3:
+            band = "low"
+        else:
+            band = "medium"
+
+        choices = self._choices.get(task_type)
+        if choices is None:
+            return self._select(task_type, band, self.cost_threshold)
+        return choices[band]
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _select(cls, task_type: TaskType, band: str, cost_threshold: Optional[float]) -> str:
+        candidates = cls.TASK_MODELS.get(task_type, {})
         preferred = candidates.get("preferred", [])
         fallback = candidates.get("fallback", [])
 
         # Filter by cost if threshold set
-        if self.cost_threshold:
-            preferred = [m for m in preferred if self.MODEL_COSTS.get(m, 0) <= self.cost_threshold]
+        if cost_threshold:
+            preferred = [m for m in preferred if cls.MODEL_COSTS.get(m, 0) <= cost_threshold]
 
         # Select based on complexity
-        if complexity_score > 0.8:
+        if band == "high":
             # High complexity - use powerful model
             model = preferred[0] if preferred else fallback[0]
-        elif complexity_score < 0.3:
+        elif band == "low":
             # Low complexity - use cheaper/faster model
             # Prefer cheaper models in preferred list
-            cheap_models = sorted(preferred, key=lambda m: self.MODEL_COSTS.get(m, 0))
+            cheap_models = sorted(preferred, key=lambda m: cls.MODEL_COSTS.get(m, 0))
             model = cheap_models[0] if cheap_models else fallback[0]
         else:
             # Medium complexity - balanced choice
@@ -106,6 +153,32 @@ class ModelRouter:
 
         return model
 
+    @asynccontextmanager
+    async def acquire(self, model: str) -> AsyncIterator[None]:
+        """
+        Hold one of the model's concurrency slots for the duration of a call.
+
+        Usage: `async with router.acquire(model): await llm.ainvoke(...)`
+        """
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = self._semaphores.setdefault(model, asyncio.Semaphore(self.DEFAULT_CONCURRENCY))
+        async with semaphore:
+            yield
+
+    def limit(self, llm: Runnable, model: str) -> Runnable:
+        """
+        Wrap an LLM so every call holds one of the model's slots.
+
+        Used as a chain step (`prompt | router.limit(llm, model)`); each
+        item of an `abatch` acquires its own slot.
+        """
+        async def call(messages: Any, config: RunnableConfig) -> Any:
+            async with self.acquire(model):
+                return await llm.ainvoke(messages, config)
+
+        return RunnableLambda(call)
+
     def estimate_cost(
         self,
         model: str,
@@ -126,3 +199,9 @@ class ModelRouter:
         cost_per_million = self.MODEL_COSTS.get(model, 0.01)
         total_tokens = input_tokens + output_tokens
         return (total_tokens / 1_000_000) * cost_per_million
+
+
+@lru_cache(maxsize=1)
+def get_shared_router() -> ModelRouter:
+    """Process-wide router, so the per-model limits hold across every agent"""
+    return ModelRouter()
@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+from langchain_core.language_models import FakeListChatModel
 from src.agents.nodes.ambiguity_scanner import AmbiguityScanner
 from src.agents.state import AgentState, StateNode
 
@@ -24,3 +26,100 @@ async def test_ambiguity_scanner_low_entropy():
 
     result = await scanner.analyze(state)
     assert result.ambiguity_score < 0.5
+
+def test_lexical_ambiguity_matches_multiword_and_punctuated_terms():
+    scanner = AmbiguityScanner(use_llm=False)
+
+    # "deal with" and "business," should both count as vague terms
+    score = scanner._calculate_lexical_ambiguity(
+        "We need to deal with the business, across all twenty regional warehouses and every planned shipment this quarter"
+    )
+    plain = scanner._calculate_lexical_ambiguity(
+        "We need to review the ledger, across all twenty regional warehouses and every planned shipment this quarter"
+    )
+    assert score > plain
+
+@pytest.mark.asyncio
+async def test_batch_analyze_matches_single_analysis():
+    scanner = AmbiguityScanner(use_llm=False)
+    inputs = [
+        "Help me with my business",
+        "Create a Gantt chart for construction project starting March 1st with 5 phases"
+    ]
+
+    results = await scanner.batch_analyze([
+        AgentState(current_node=StateNode.AMBIGUITY_SCANNER, user_input=text)
+        for text in inputs
+    ])
+
+    assert [r.user_input for r in results] == inputs
+    assert results[0].ambiguity_score > 0.7
+    assert results[1].ambiguity_score < 0.5
+
+@pytest.mark.asyncio
+async def test_batch_analyze_sends_llm_requests_through_abatch():
+    llm = FakeListChatModel(responses=["first", "second", "third"])
+    scanner = AmbiguityScanner(llm=llm)
+    inputs = ["Help me with my business", "Fix stuff", "Plan a 5 phase rollout"]
+
+    results = await scanner.batch_analyze([
+        AgentState(current_node=StateNode.AMBIGUITY_SCANNER, user_input=text)
+        for text in inputs
+    ])
+
+    assert [r.user_input for r in results] == inputs
+    assert [r.conversation_history[-1]["content"] for r in results] == ["first", "second", "third"]
+
+@pytest.mark.asyncio
+async def test_large_input_is_scored_in_chunks_without_blocking():
+    scanner = AmbiguityScanner(use_llm=False)
+    # Long enough for several chunks, with "deal with" landing on cuts
+    text = "please deal with this stuff and review the plan\n" * 2000
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    score = await scanner._lexical_score(text)
+    task.cancel()
+
+    assert score == scanner._calculate_lexical_ambiguity(text)
+    assert ticks > 2
+
+@pytest.mark.asyncio
+async def test_repeated_input_reuses_llm_analysis():
+    scanner = AmbiguityScanner(llm=FakeListChatModel(responses=["first", "second"]))
+
+    def make_state(text):
+        return AgentState(current_node=StateNode.AMBIGUITY_SCANNER, user_input=text)
+
+    first = await scanner.analyze(make_state("Help me with my business"))
+    again = await scanner.analyze(make_state("Help me with my business"))
+    other = await scanner.analyze(make_state("Fix stuff"))
+
+    assert first.conversation_history[-1]["content"] == "first"
+    assert again.conversation_history[-1]["content"] == "first"
+    assert other.conversation_history[-1]["content"] == "second"
+
+@pytest.mark.asyncio
+async def test_batch_analyze_shares_the_analysis_cache():
+    scanner = AmbiguityScanner(llm=FakeListChatModel(responses=["first", "second", "third"]))
+
+    def make_state(text):
+        return AgentState(current_node=StateNode.AMBIGUITY_SCANNER, user_input=text)
+
+    single = await scanner.analyze(make_state("Help me with my business"))
+    batch = await scanner.batch_analyze([
+        make_state("Help me with my business"), make_state("Fix stuff"), make_state("Fix stuff")
+    ])
+    again = await scanner.analyze(make_state("Fix stuff"))
+
+    # Only "Fix stuff" reaches the LLM, once; later single calls see its result
+    assert single.conversation_history[-1]["content"] == "first"
+    assert [r.conversation_history[-1]["content"] for r in batch] == ["first", "second", "second"]
+    assert again.conversation_history[-1]["content"] == "second"
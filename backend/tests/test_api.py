@@ -1,15 +1,68 @@
+import asyncio
+import types
 import pytest
 from httpx import AsyncClient, ASGITransport
+from src.api import main
 from src.api.main import app
+from src.agents.nodes.ambiguity_scanner import AmbiguityScanner
 
 @pytest.mark.asyncio
 async def test_process_input_endpoint():
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        response = await client.post("/api/agent/process", json={
-            "input": "Help me optimize my supply chain",
-            "session_id": "test-123"
-        })
+    # ASGITransport doesn't send lifespan events, so run the lifespan here
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/agent/process", json={
+                "input": "Help me optimize my supply chain",
+                "session_id": "test-123"
+            })
 
     assert response.status_code == 200
     data = response.json()
     assert "ambiguity_score" in data
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_on_one_session_both_commit(monkeypatch):
+    original_analyze = AmbiguityScanner.analyze
+
+    async def slow_analyze(self, state):
+        # Both requests load the session before either commits
+        await asyncio.sleep(0.01)
+        return await original_analyze(self, state)
+
+    monkeypatch.setattr(AmbiguityScanner, "analyze", slow_analyze)
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.post("/api/agent/process", json={"input": text, "session_id": "race-1"})
+                for text in ("Help me optimize my supply chain", "Focus on cost reduction")
+            ))
+        state = await app.state.sessions.get("race-1")
+
+    assert [r.status_code for r in responses] == [200, 200]
+    # The loser of the race re-ran on the winner's state, so nothing was lost
+    assert state.version == 2
+    assert len(state.user_clarifications) == 1
+
+@pytest.mark.asyncio
+async def test_follow_up_input_is_recorded_as_a_clarification():
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            for text in ("Help me with my business", "We sell bikes online", "Mostly in Europe"):
+                response = await client.post("/api/agent/process", json={"input": text, "session_id": "follow-up-1"})
+                assert response.status_code == 200
+        state = await app.state.sessions.get("follow-up-1")
+
+    # The opening input is the request itself; only later turns answer questions
+    assert state.user_input == "Mostly in Europe"
+    assert state.user_clarifications == ["We sell bikes online", "Mostly in Europe"]
+    assert [m["clarification"] for m in state.conversation_history if m.get("role") == "user"] == [
+        "We sell bikes online", "Mostly in Europe"
+    ]
+
+def test_sessions_use_redis_only_when_configured(monkeypatch):
+    monkeypatch.setattr(main, "get_config", lambda: types.SimpleNamespace(redis_url="redis://cache:6379/0"))
+    assert main._session_store().use_memory is False
+
+    monkeypatch.setattr(main, "get_config", lambda: types.SimpleNamespace(redis_url=None))
+    assert main._session_store().use_memory is True
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from src.agents.council.council_manager import CouncilManager
 from src.agents.state import AgentState, StateNode
@@ -19,3 +20,93 @@ async def test_council_deliberation():
     assert "optimist_view" in result.project_logic
     assert "pessimist_view" in result.project_logic
     assert "synthesis" in result.project_logic
+
+@pytest.mark.asyncio
+async def test_council_reuses_cached_deliberation():
+    council = CouncilManager(use_llm=False)
+    calls = []
+    original_plan = council.optimist.plan
+
+    async def counting_plan(state):
+        calls.append(state)
+        return await original_plan(state)
+
+    council.optimist.plan = counting_plan
+
+    first = await council.deliberate(
+        AgentState(current_node=StateNode.STRATEGY_MOTOR, user_input="Launch product in 2 months")
+    )
+    second = await council.deliberate(
+        AgentState(current_node=StateNode.STRATEGY_MOTOR, user_input="Launch product in 2 months")
+    )
+
+    assert len(calls) == 1
+    assert second.project_logic == first.project_logic
+
+@pytest.mark.asyncio
+async def test_council_cache_misses_after_memory_write_or_new_context():
+    council = CouncilManager(use_llm=False)
+    calls = []
+    original_verify = council.historian.verify
+
+    async def counting_verify(state):
+        calls.append(state)
+        return await original_verify(state)
+
+    council.historian.verify = counting_verify
+
+    def make_state(project_logic=None):
+        return AgentState(
+            current_node=StateNode.STRATEGY_MOTOR,
+            user_input="Launch product in 2 months",
+            project_logic=project_logic
+        )
+
+    await council.deliberate(make_state())
+    await council.memory.store_episodic("Launch was postponed last quarter")
+    await council.deliberate(make_state())
+    assert len(calls) == 2
+
+    # Agents see prior project_logic, so it must be part of the key
+    await council.deliberate(make_state({"synthesis": "Earlier plan"}))
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_batch_deliberate_preserves_order_and_bounds_concurrency():
+    council = CouncilManager(use_llm=False)
+    council.BATCH_CONCURRENCY = 2
+    in_flight = 0
+    peak = 0
+    original_plan = council.optimist.plan
+
+    async def slow_plan(state):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return await original_plan(state)
+
+    council.optimist.plan = slow_plan
+    inputs = [f"Launch product {i} in 2 months" for i in range(6)]
+
+    results = await council.batch_deliberate([
+        AgentState(current_node=StateNode.STRATEGY_MOTOR, user_input=text)
+        for text in inputs
+    ])
+
+    assert [r.user_input for r in results] == inputs
+    assert all("synthesis" in r.project_logic for r in results)
+    assert peak == 2
+
+def test_council_agents_keep_their_own_temperatures(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    council = CouncilManager(use_llm=True)
+
+    # Requests are built from the client's own temperature, so each agent
+    # needs a client configured with it
+    assert council.optimist.llm.temperature == 0.8
+    assert council.pessimist.llm.temperature == 0.3
+    assert council.historian.llm.temperature == 0.2
+    assert council.synthesizer.llm.temperature == 0.5
+    assert council.synthesizer.llm is CouncilManager(use_llm=True).synthesizer.llm
@@ -1,5 +1,5 @@
 import pytest
-from src.agents.state import AgentState, StateNode
+from src.agents.state import AgentState, StateNode, append_user_clarification
 from src.agents.graph import CognitiveGraph
 
 def test_state_transitions():
@@ -12,3 +12,31 @@ def test_state_transitions():
 
     next_node = graph.determine_transition(initial_state)
     assert next_node == StateNode.SOCRATIC_INTERROGATOR
+
+def test_state_round_trips_with_structured_history():
+    state = AgentState(
+        current_node=StateNode.SOCRATIC_INTERROGATOR,
+        user_input="Help me fix my supply chain",
+        conversation_history=[{"role": "assistant", "questions": ["What is the budget?"]}]
+    )
+
+    restored = AgentState.model_validate_json(state.model_dump_json())
+    assert restored == state
+
+def test_user_clarifications_track_history():
+    state = AgentState(
+        current_node=StateNode.ONTOLOGY_ARCHITECT,
+        user_input="Help me fix my supply chain",
+        conversation_history=[
+            {"role": "user", "clarification": "Focus on cost reduction"},
+            {"role": "assistant", "content": "Noted"}
+        ]
+    )
+    assert state.user_clarifications == ["Focus on cost reduction"]
+
+    append_user_clarification(state, "Physical goods, not digital")
+    assert state.user_clarifications == ["Focus on cost reduction", "Physical goods, not digital"]
+    assert state.conversation_history[-1] == {"role": "user", "clarification": "Physical goods, not digital"}
+
+    restored = AgentState.model_validate_json(state.model_dump_json())
+    assert restored.user_clarifications == state.user_clarifications
@@ -1,5 +1,6 @@
+import re
 import pytest
-from src.memory.graph_store import TemporalKnowledgeGraph
+from src.memory.graph_store import MAX_CHAIN_DEPTH, TemporalKnowledgeGraph
 from datetime import datetime
 
 @pytest.mark.asyncio
@@ -18,3 +19,221 @@ async def test_create_entity_relationship():
 
     assert rel is not None
     assert rel["type"] == "BLOCKS"
+
+@pytest.mark.asyncio
+async def test_query_dependencies_uses_incoming_dependency_edges_only():
+    graph = TemporalKnowledgeGraph()
+    design = await graph.create_entity("Task", {"name": "Design"})
+    build = await graph.create_entity("Task", {"name": "Build"})
+    supplier = await graph.create_entity("Supplier", {"name": "Acme"})
+
+    await graph.create_relationship(design, "PRECEDES", build)
+    await graph.create_relationship(supplier, "SUPPLIES_TO", build)
+    await graph.create_relationship(build, "BLOCKS", design)
+
+    deps = await graph.query_dependencies(build["id"])
+
+    assert [(entity["name"], rel["type"]) for entity, rel in deps] == [("Design", "PRECEDES")]
+    assert await graph.query_dependencies("unknown-id") == []
+
+@pytest.mark.asyncio
+async def test_query_dependency_chain_walks_transitive_dependencies():
+    graph = TemporalKnowledgeGraph()
+    design, build, test, ship = await graph.create_entities_bulk(
+        "Task", [{"name": "Design"}, {"name": "Build"}, {"name": "Test"}, {"name": "Ship"}]
+    )
+    supplier = await graph.create_entity("Supplier", {"name": "Acme"})
+
+    await graph.create_relationship(design, "PRECEDES", build)
+    await graph.create_relationship(build, "BLOCKS", test)
+    await graph.create_relationship(design, "DEPENDS_ON", test)
+    await graph.create_relationship(test, "PRECEDES", ship)
+    await graph.create_relationship(supplier, "SUPPLIES_TO", build)
+    # A cycle back into the chain must not loop forever
+    await graph.create_relationship(ship, "BLOCKS", design)
+
+    chain = await graph.query_dependency_chain(ship["id"])
+
+    assert [(entity["name"], rel["type"]) for entity, rel in chain] == [
+        ("Test", "PRECEDES"), ("Build", "BLOCKS"), ("Design", "DEPENDS_ON")
+    ]
+    assert await graph.query_dependency_chain("unknown-id") == []
+
+@pytest.mark.asyncio
+async def test_query_entities_by_deadline():
+    graph = TemporalKnowledgeGraph()
+    # Enough entities to grow the column buffers past their initial size
+    for day in range(1, 21):
+        await graph.create_entity("Task", {"name": f"Task {day}", "deadline": f"2026-02-{day:02d}"})
+    await graph.create_entity("Task", {"name": "Someday"})
+    await graph.create_entity("Task", {"name": "Bad date", "deadline": "soon"})
+    await graph.create_entity("Milestone", {"name": "Kickoff", "deadline": "2026-01-01"})
+
+    due = await graph.query_entities_by_deadline("Task", datetime(2026, 2, 4))
+
+    assert [e["name"] for e in due] == ["Task 1", "Task 2", "Task 3"]
+    assert await graph.query_entities_by_deadline("Risk", datetime(2026, 2, 4)) == []
+
+@pytest.mark.asyncio
+async def test_bulk_creation_matches_single_calls():
+    graph = TemporalKnowledgeGraph()
+
+    tasks = await graph.create_entities_bulk("Task", [{"name": "Design"}, {"name": "Build"}, {"name": "Ship"}])
+    rels = await graph.create_relationships_bulk(
+        "PRECEDES", [(tasks[0], tasks[1]), (tasks[1], tasks[2])], {"lag_days": 2}
+    )
+
+    assert [t["name"] for t in tasks] == ["Design", "Build", "Ship"]
+    assert all(r["lag_days"] == 2 and "valid_from" in r for r in rels)
+    deps = await graph.query_dependencies(tasks[2]["id"])
+    assert [entity["name"] for entity, _ in deps] == ["Build"]
+
+class _FakeResult:
+    async def values(self):
+        return [[{"id": "n1", "name": "Design"}]]
+
+class _FakeTx:
+    async def run(self, query, **params):
+        return _FakeResult()
+
+# (a)-[:T1|T2*1..N]->(b) or (a)<-[:T1|T2*1..N]-(b), with optional "r" and "p = "
+_MATCH_RE = re.compile(r"MATCH (?:p = )?\((\w+)\)(<?)-\[r?:([\w|]+)(?:\*1\.\.(\d+))?\]-(>?)\((\w+)\)")
+
+class _PatternTx:
+    """
+    Answers a dependency MATCH from an in-memory graph's relationships,
+    honouring the pattern's arrow direction, relationship types and depth.
+    Lets the Cypher and in-memory paths be compared on one fixture.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    async def run(self, query, entity_id):
+        left, back, types, depth, _, right = _MATCH_RE.search(query).groups()
+        types = set(types.split("|"))
+        bound_left = re.search(rf"WHERE {left}\.id = \$entity_id", query) is not None
+        # Walk the edges with the bound node at the arrow's tail or head
+        outgoing = bound_left != bool(back)
+
+        rows, seen, frontier = [], {entity_id}, [entity_id]
+        for _ in range(int(depth or 1)):
+            step = []
+            for node in frontier:
+                for rel in self.graph.relationships:
+                    near, far = (rel["from_id"], rel["to_id"]) if outgoing else (rel["to_id"], rel["from_id"])
+                    if near == node and rel["type"] in types and far not in seen:
+                        seen.add(far)
+                        step.append(far)
+                        rows.append([self.graph.entities[far], rel])
+            frontier = step
+        return _RowsResult(rows)
+
+class _RowsResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def values(self):
+        return self.rows
+
+class _FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        self.driver.opened += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_write(self, work, *args):
+        self.driver.writes += 1
+        return await work(_FakeTx(), *args)
+
+    async def execute_read(self, work, *args):
+        return await work(_PatternTx(self.driver.graph), *args)
+
+class _FakeDriver:
+    def __init__(self, graph=None):
+        self.opened = 0
+        self.writes = 0
+        # In-memory graph that reads are answered from
+        self.graph = graph
+
+    def session(self):
+        return _FakeSession(self)
+
+@pytest.mark.asyncio
+async def test_neo4j_writes_share_a_session_inside_a_block():
+    graph = TemporalKnowledgeGraph(use_memory=False)
+    graph.driver = _FakeDriver()
+
+    async with graph.session():
+        await graph.create_entity("Task", {"name": "Design"})
+        await graph.create_entity("Task", {"name": "Build"})
+    assert (graph.driver.opened, graph.driver.writes) == (1, 2)
+
+    entity = await graph.create_entity("Task", {"name": "Ship"})
+    assert graph.driver.opened == 2
+    assert entity["id"] == "n1"
+
+@pytest.mark.asyncio
+async def test_session_blocks_are_scoped_to_their_graph_store():
+    first, second = TemporalKnowledgeGraph(use_memory=False), TemporalKnowledgeGraph(use_memory=False)
+    first.driver, second.driver = _FakeDriver(), _FakeDriver()
+
+    async with first.session() as outer:
+        # Another store inside the block must not borrow first's session
+        async with second.session() as inner:
+            assert inner is not outer
+            async with first.session() as nested:
+                assert nested is outer
+        await first.create_entity("Task", {"name": "Design"})
+
+    assert (first.driver.opened, second.driver.opened) == (1, 1)
+
+async def _dependency_fixture():
+    graph = TemporalKnowledgeGraph()
+    design, build, ship = await graph.create_entities_bulk(
+        "Task", [{"name": "Design"}, {"name": "Build"}, {"name": "Ship"}]
+    )
+    await graph.create_relationship(design, "PRECEDES", build)
+    await graph.create_relationship(build, "BLOCKS", ship)
+    return graph, {"Design": design, "Build": build, "Ship": ship}
+
+def _neo4j_view(graph):
+    neo4j = TemporalKnowledgeGraph(use_memory=False)
+    neo4j.driver = _FakeDriver(graph)
+    return neo4j
+
+@pytest.mark.asyncio
+async def test_dependency_query_matches_in_memory_direction():
+    graph, tasks = await _dependency_fixture()
+    neo4j = _neo4j_view(graph)
+
+    for name, task in tasks.items():
+        in_memory = await graph.query_dependencies(task["id"])
+        cypher = await neo4j.query_dependencies(task["id"])
+        assert [e["name"] for e, _ in cypher] == [e["name"] for e, _ in in_memory], name
+
+    # Build depends on Design, not on Ship
+    assert [e["name"] for e, _ in await neo4j.query_dependencies(tasks["Build"]["id"])] == ["Design"]
+
+@pytest.mark.asyncio
+async def test_dependency_chain_query_matches_in_memory_bfs():
+    graph, tasks = await _dependency_fixture()
+    # Longer than MAX_CHAIN_DEPTH, so both backends must stop at the bound
+    steps = await graph.create_entities_bulk("Step", [{"name": f"Step {i}"} for i in range(MAX_CHAIN_DEPTH + 2)])
+    await graph.create_relationships_bulk("DEPENDS_ON", list(zip(steps[1:], steps)))
+    await graph.create_relationship(steps[0], "BLOCKS", tasks["Design"])
+    neo4j = _neo4j_view(graph)
+
+    for task in [*tasks.values(), steps[-1]]:
+        in_memory = await graph.query_dependency_chain(task["id"])
+        cypher = await neo4j.query_dependency_chain(task["id"])
+        assert [(e["name"], r["type"]) for e, r in cypher] == [(e["name"], r["type"]) for e, r in in_memory]
+
+    chain = await graph.query_dependency_chain(tasks["Ship"]["id"])
+    assert [e["name"] for e, _ in chain][:3] == ["Build", "Design", "Step 0"]
+    assert len(chain) == MAX_CHAIN_DEPTH
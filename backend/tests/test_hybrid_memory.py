@@ -31,3 +31,19 @@ async def test_semantic_memory_reasoning():
 
     assert len(chain) > 0
     assert any("Design Phase" in str(item) for item in chain)
+
+@pytest.mark.asyncio
+async def test_semantic_bulk_store_links_new_entities():
+    memory = HybridMemory()
+    await memory.initialize()
+
+    phases, rels = await memory.store_semantic_bulk(
+        "Task",
+        [{"name": "Design Phase"}, {"name": "Development Phase"}, {"name": "Launch"}],
+        "PRECEDES",
+        [(0, 1), (1, 2)]
+    )
+
+    assert [r["from_id"] for r in rels] == [phases[0]["id"], phases[1]["id"]]
+    chain = await memory.get_causal_chain(phases[2]["id"])
+    assert [entity["name"] for entity, _ in chain] == ["Development Phase", "Design Phase"]
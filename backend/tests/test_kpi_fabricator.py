@@ -21,3 +21,20 @@ async def test_fabricates_custom_kpis():
     assert len(kpis) > 0
     assert any("stress" in kpi["name"].lower() or "sentiment" in kpi["name"].lower() for kpi in kpis)
     assert all("measurement_method" in kpi for kpi in kpis)
+
+@pytest.mark.asyncio
+async def test_edits_to_offline_kpis_stay_in_their_state():
+    fabricator = KPIFabricator(use_llm=False)
+    ontology = {"entities": []}
+
+    edited = await fabricator.fabricate_kpis(
+        AgentState(current_node=StateNode.ONTOLOGY_ARCHITECT, user_input="Calmer team", domain_ontology=ontology)
+    )
+    edited.kpis[0]["target_value"] = "< 0.2"
+    edited.kpis.pop()
+
+    fresh = await fabricator.fabricate_kpis(
+        AgentState(current_node=StateNode.ONTOLOGY_ARCHITECT, user_input="Calmer team", domain_ontology=ontology)
+    )
+    assert len(fresh.kpis) == 3
+    assert "target_value" not in fresh.kpis[0]
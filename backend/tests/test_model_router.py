@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+from langchain_core.runnables import RunnableLambda
 from src.routing.model_router import ModelRouter, TaskType
 
 def test_router_selects_appropriate_model():
@@ -22,3 +24,52 @@ def test_router_considers_cost():
     # Should prefer cheaper models when cost-conscious
     model = router.select_model(TaskType.AMBIGUITY_SCAN, complexity_score=0.5)
     assert "haiku" in model.lower() or "mini" in model.lower()
+
+def test_router_decisions_depend_only_on_complexity_band():
+    router = ModelRouter(cost_threshold=0.02)
+
+    for task_type in TaskType:
+        assert router.select_model(task_type, complexity_score=0.85) == router.select_model(task_type, complexity_score=0.95)
+        assert router.select_model(task_type, complexity_score=0.1) == router.select_model(task_type, complexity_score=0.29)
+        assert router.select_model(task_type, complexity_score=0.3) == router.select_model(task_type, complexity_score=0.8)
+
+@pytest.mark.asyncio
+async def test_acquire_caps_in_flight_calls_per_model():
+    router = ModelRouter()
+    limit = ModelRouter.MODEL_CONCURRENCY["gemini-2.0-flash-exp"]
+    in_flight = peak = 0
+
+    async def call(model):
+        nonlocal in_flight, peak
+        async with router.acquire(model):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+    await asyncio.gather(*(call("gemini-2.0-flash-exp") for _ in range(limit * 3)))
+    assert peak == limit
+
+    peak = 0
+    await asyncio.gather(*(call("unlisted-model") for _ in range(10)))
+    assert peak == ModelRouter.DEFAULT_CONCURRENCY
+
+@pytest.mark.asyncio
+async def test_limited_llm_takes_a_slot_per_batched_item():
+    router = ModelRouter()
+    limit = ModelRouter.MODEL_CONCURRENCY["gemini-2.0-flash-exp"]
+    in_flight = peak = 0
+
+    async def slow_llm(text):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return text.upper()
+
+    limited = router.limit(RunnableLambda(slow_llm), "gemini-2.0-flash-exp")
+    results = await limited.abatch([f"call {i}" for i in range(limit * 3)], config={"max_concurrency": limit * 3})
+
+    assert results == [f"CALL {i}" for i in range(limit * 3)]
+    assert peak == limit
@@ -21,3 +21,18 @@ async def test_generates_domain_ontology():
     assert "entities" in ontology
     assert any(e["type"] == "Supplier" for e in ontology["entities"])
     assert any(e["type"] == "Inventory" for e in ontology["entities"])
+
+@pytest.mark.asyncio
+async def test_offline_ontology_is_not_shared_between_states():
+    architect = OntologyArchitect(use_llm=False)
+    first = await architect.generate_ontology(
+        AgentState(current_node=StateNode.ONTOLOGY_ARCHITECT, user_input="Optimize supply chain")
+    )
+    first.domain_ontology["entities"][0]["properties"]["region"] = "str"
+
+    second = await architect.generate_ontology(
+        AgentState(current_node=StateNode.ONTOLOGY_ARCHITECT, user_input="Optimize supply chain")
+    )
+
+    assert "region" not in second.domain_ontology["entities"][0]["properties"]
+    assert second.domain_ontology["domain"] == first.domain_ontology["domain"]
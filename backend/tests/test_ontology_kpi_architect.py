@@ -0,0 +1,46 @@
+import json
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from src.agents.nodes.ontology_kpi_architect import OntologyKPIArchitect
+from src.agents.state import AgentState, StateNode
+
+def _state():
+    return AgentState(
+        current_node=StateNode.ONTOLOGY_ARCHITECT,
+        user_input="Optimize supply chain for electronics manufacturing",
+        conversation_history=[{"role": "user", "clarification": "Focus on cost reduction"}]
+    )
+
+@pytest.mark.asyncio
+async def test_generates_ontology_and_kpis_in_one_call():
+    response = {
+        "ontology": {
+            "domain": "electronics supply chain",
+            "entities": [{"type": "Supplier", "properties": {"lead_time": "int"}, "description": "Parts vendor"}],
+            "relationships": [],
+            "logic_rules": []
+        },
+        "kpis": [{
+            "name": "Average Supplier Lead Time",
+            "description": "Days from order to delivery",
+            "measurement_method": "Mean of Supplier.lead_time",
+            "data_source": "Supplier records",
+            "optimization_direction": "minimize"
+        }]
+    }
+    # A second response would only be consumed by a second call
+    llm = FakeListChatModel(responses=[json.dumps(response), "unexpected second call"])
+
+    result = await OntologyKPIArchitect(llm=llm).generate(_state())
+
+    assert result.domain_ontology["entities"][0]["type"] == "Supplier"
+    assert result.kpis[0]["name"] == "Average Supplier Lead Time"
+    assert [m["type"] for m in result.conversation_history[-2:]] == ["ontology", "kpis"]
+    assert llm.i == 1
+
+@pytest.mark.asyncio
+async def test_offline_mode_delegates_to_separate_nodes():
+    result = await OntologyKPIArchitect(use_llm=False).generate(_state())
+
+    assert any(e["type"] == "Supplier" for e in result.domain_ontology["entities"])
+    assert len(result.kpis) > 0
@@ -0,0 +1,33 @@
+import pytest
+from src.memory.query_cache import QueryCache
+
+def test_exact_query_hits_cache_and_evicts_lru():
+    cache = QueryCache(capacity=2)
+
+    cache.put("supply chain", [{"content": "cached"}])
+    cache.put("inventory", [{"content": "other"}])
+    assert cache.get("supply chain") == [{"content": "cached"}]
+    assert cache.get("supply chain costs") is None
+
+    # "inventory" is now least recently used
+    cache.put("suppliers", [])
+    assert cache.get("inventory") is None
+    assert len(cache) == 2
+
+@pytest.mark.asyncio
+async def test_get_or_compute_expires_after_ttl():
+    now = [0.0]
+    cache = QueryCache(ttl=10.0, clock=lambda: now[0])
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return ["result"]
+
+    await cache.get_or_compute("supply chain history", compute)
+    await cache.get_or_compute("supply chain history", compute)
+    assert len(calls) == 1
+
+    now[0] = 11.0
+    await cache.get_or_compute("supply chain history", compute)
+    assert len(calls) == 2
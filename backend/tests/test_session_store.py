@@ -0,0 +1,147 @@
+import asyncio
+import sys
+import types
+import pytest
+from src.api.session_store import SessionStore, LOCK_TTL_MS, SESSION_TTL_SECONDS
+from src.agents.state import AgentState, StateNode
+
+@pytest.mark.asyncio
+async def test_session_round_trips_and_expires():
+    now = [0.0]
+    store = SessionStore(clock=lambda: now[0])
+    await store.connect()
+    state = AgentState(
+        current_node=StateNode.SOCRATIC_INTERROGATOR,
+        user_input="Help me fix my supply chain",
+        conversation_history=[{"role": "assistant", "questions": ["What is the budget?"]}]
+    )
+
+    await store.set("s1", state)
+    assert await store.get("s1") == state
+    assert await store.get("missing") is None
+
+    now[0] += SESSION_TTL_SECONDS + 1
+    assert await store.get("s1") is None
+
+@pytest.mark.asyncio
+async def test_session_lock_serializes_same_session_only():
+    store = SessionStore()
+    order = []
+
+    async def hold(session_id, tag):
+        async with store.lock(session_id):
+            order.append(f"{tag}-start")
+            await asyncio.sleep(0.01)
+            order.append(f"{tag}-end")
+
+    await asyncio.gather(hold("a", "a1"), hold("a", "a2"), hold("b", "b1"))
+
+    assert order.index("a1-end") < order.index("a2-start")
+    assert order.index("b1-start") < order.index("a1-end")
+
+@pytest.mark.asyncio
+async def test_purge_drops_only_sessions_past_their_latest_deadline():
+    now = [0.0]
+    store = SessionStore(clock=lambda: now[0])
+    state = AgentState(current_node=StateNode.AMBIGUITY_SCANNER, user_input="Launch product")
+
+    await store.set("idle", state)
+    await store.set("active", state)
+    now[0] += SESSION_TTL_SECONDS - 1
+    # Touching "active" restarts its TTL; its first heap entry goes stale
+    await store.set("active", state)
+    async with store.lock("idle"):
+        pass
+
+    now[0] += 2
+    store.purge_expired()
+
+    assert "idle" not in store._sessions and "idle" not in store._locks
+    assert await store.get("active") == state
+
+class _FakeRedis:
+    """Just the redis.asyncio commands SessionStore uses, in a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.closed = False
+
+    @classmethod
+    def from_url(cls, url):
+        redis = cls()
+        redis.url = url
+        return redis
+
+    async def ping(self):
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        self.ttls[key] = ex * 1000 if ex else px
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        # The release script: delete only if the token still matches
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def aclose(self):
+        self.closed = True
+
+@pytest.mark.asyncio
+async def test_connect_uses_configured_redis_url(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", types.ModuleType("redis"))
+    monkeypatch.setitem(sys.modules, "redis.asyncio", types.SimpleNamespace(Redis=_FakeRedis))
+    config = types.SimpleNamespace(redis_url="redis://cache:6379/1")
+    store = SessionStore(config=config, use_memory=False)
+
+    await store.connect()
+    await store.close()
+
+    assert not store.use_memory
+    assert store.redis.url == "redis://cache:6379/1"
+    assert store.redis.closed
+
+@pytest.mark.asyncio
+async def test_redis_sessions_round_trip_with_ttl():
+    store = SessionStore(use_memory=False)
+    store.redis = _FakeRedis()
+    state = AgentState(current_node=StateNode.SOCRATIC_INTERROGATOR, user_input="Help me fix my supply chain")
+
+    await store.set("s1", state)
+
+    assert await store.get("s1") == state
+    assert await store.get("missing") is None
+    assert store.redis.ttls["sess:s1"] == SESSION_TTL_SECONDS * 1000
+
+@pytest.mark.asyncio
+async def test_redis_lock_serializes_same_session_and_releases_only_its_own_lease():
+    store = SessionStore(use_memory=False)
+    store.redis = _FakeRedis()
+    order = []
+
+    async def hold(session_id, tag):
+        async with store.lock(session_id):
+            order.append(f"{tag}-start")
+            await asyncio.sleep(0.01)
+            order.append(f"{tag}-end")
+
+    await asyncio.gather(hold("a", "a1"), hold("a", "a2"), hold("b", "b1"))
+
+    assert order.index("a1-end") < order.index("a2-start")
+    assert order.index("b1-start") < order.index("a1-end")
+    assert store.redis.ttls["sess:lock:a"] == LOCK_TTL_MS
+    assert store.redis.data == {}
+
+    # Our lease expired and another worker took the lock: leave theirs alone
+    async with store.lock("c"):
+        store.redis.data["sess:lock:c"] = "other-worker"
+    assert store.redis.data == {"sess:lock:c": "other-worker"}
@@ -1,4 +1,5 @@
 import pytest
+from langchain_core.language_models import FakeListChatModel
 from src.agents.nodes.socratic_interrogator import SocraticInterrogator
 from src.agents.state import AgentState, StateNode
 
@@ -17,3 +18,18 @@ async def test_generates_clarifying_questions():
 
     assert len(questions) >= 2
     assert any("cost" in q.lower() or "speed" in q.lower() for q in questions)
+
+@pytest.mark.asyncio
+async def test_questions_use_related_episodes():
+    llm = FakeListChatModel(responses=['{"questions": ["Which suppliers?", "What budget?"], "reasoning": "scope"}'])
+    interrogator = SocraticInterrogator(llm=llm)
+    state = AgentState(
+        current_node=StateNode.SOCRATIC_INTERROGATOR,
+        user_input="Help me fix my supply chain",
+        ambiguity_score=0.85
+    )
+    episodes = [{"content": "Last quarter we cut supplier lead times", "metadata": {}}]
+
+    result = await interrogator.generate_questions(state, episodes)
+
+    assert result.conversation_history[-1]["questions"] == ["Which suppliers?", "What budget?"]
@@ -0,0 +1,150 @@
+import asyncio
+import random
+import sys
+import types
+import zlib
+import numpy as np
+import pytest
+from src.memory.vector_store import EpisodicMemory, _load_encoder
+
+def _overlap_ranking(docs, query, k):
+    # Reference: the original set-overlap scan, stable on ties
+    query_words = set(query.lower().split())
+    scored = [(len(query_words & set(d.lower().split())), d) for d in docs]
+    scored = [(s, d) for s, d in scored if s > 0]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [d for _, d in scored[:k]]
+
+@pytest.mark.asyncio
+async def test_retrieve_matches_keyword_overlap_ranking():
+    rng = random.Random(7)
+    words = ["supply", "chain", "cost", "lead", "time", "Supplier", "budget", "risk", "launch", "quarter"]
+    docs = [" ".join(rng.choices(words, k=rng.randint(1, 8))) for _ in range(EpisodicMemory.FLUSH_EVERY + 50)]
+
+    memory = EpisodicMemory()
+    for i, doc in enumerate(docs):
+        await memory.store(doc)
+        if i == 10:
+            # Retrieval between stores must see the buffered rows
+            assert await memory.retrieve("supply cost", k=3) == [
+                {"content": d, "metadata": {}} for d in _overlap_ranking(docs[:11], "supply cost", 3)
+            ]
+
+    for query in ["supply cost risk", "supplier LAUNCH", "unrelated words"]:
+        results = await memory.retrieve(query, k=5)
+        assert [r["content"] for r in results] == _overlap_ranking(docs, query, 5)
+
+class _HashingEncoder:
+    # Stand-in for the sentence-transformer: bag of words hashed into buckets
+    def encode(self, texts, normalize_embeddings, convert_to_numpy):
+        vectors = np.zeros((len(texts), EpisodicMemory.EMBEDDING_DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % EpisodicMemory.EMBEDDING_DIM] += 1
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+@pytest.mark.asyncio
+async def test_ann_retrieval_buffers_embeds_and_grows_index():
+    hnswlib = pytest.importorskip("hnswlib")
+    memory = EpisodicMemory(use_memory=False)
+    memory.HNSW_INITIAL_CAPACITY = 4
+    memory._encoder = _HashingEncoder()
+    memory._index = memory._new_index(hnswlib)
+
+    topics = ["supplier lead time", "marketing launch budget", "warehouse safety stock"]
+    for i in range(12):
+        await memory.store(f"{topics[i % 3]} note {i}")
+
+    results = await memory.retrieve("supplier lead time", k=3)
+
+    assert memory._index.get_current_count() == 12
+    assert all("supplier lead time" in r["content"] for r in results)
+
+@pytest.mark.asyncio
+async def test_reconnect_keeps_indexed_episodes():
+    hnswlib = pytest.importorskip("hnswlib")
+    memory = EpisodicMemory(use_memory=False)
+    memory._encoder = _HashingEncoder()
+    memory._index = memory._new_index(hnswlib)
+    await memory.store("supplier lead time slipped")
+    assert len(await memory.retrieve("supplier lead time", k=1)) == 1
+
+    # Every council deliberation re-runs HybridMemory.initialize
+    await memory.connect()
+
+    assert not memory.use_memory
+    assert [r["content"] for r in await memory.retrieve("supplier lead time", k=1)] == [
+        "supplier lead time slipped"
+    ]
+
+@pytest.mark.asyncio
+async def test_store_skips_exact_duplicates():
+    memory = EpisodicMemory()
+
+    assert await memory.store("Launch slipped by two weeks") is True
+    assert await memory.store("Launch slipped by two weeks") is False
+    assert await memory.store("Launch slipped by three weeks") is True
+
+    results = await memory.retrieve("launch slipped", k=5)
+    assert len(memory.documents) == 2
+    assert len(results) == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_embedding_pass():
+    hnswlib = pytest.importorskip("hnswlib")
+    memory = EpisodicMemory(use_memory=False)
+    encoder = _HashingEncoder()
+    batches = []
+
+    def counting_encode(texts, **kwargs):
+        batches.append(len(texts))
+        return encoder.encode(texts, **kwargs)
+
+    memory._encoder = type("Encoder", (), {"encode": staticmethod(counting_encode)})()
+    memory._index = memory._new_index(hnswlib)
+    for topic in ["supplier lead time", "marketing launch budget", "warehouse safety stock"]:
+        await memory.store(topic)
+    await memory.retrieve("warmup", k=1)
+    batches.clear()
+
+    results = await asyncio.gather(*(
+        memory.retrieve(query, k=1)
+        for query in ["supplier lead", "launch budget", "safety stock", "lead time"]
+    ))
+    await memory.close()
+
+    assert batches == [4]
+    assert results[0][0]["content"] == "supplier lead time"
+    assert results[2][0]["content"] == "warehouse safety stock"
+
+@pytest.mark.asyncio
+async def test_connect_shares_one_warmed_encoder_across_instances(monkeypatch):
+    pytest.importorskip("hnswlib")
+    loads = []
+    encodes = []
+
+    class FakeSentenceTransformer(_HashingEncoder):
+        def __init__(self, *args, **kwargs):
+            loads.append(args)
+
+        def encode(self, texts, **kwargs):
+            encodes.append(texts)
+            return super().encode(texts, **kwargs)
+
+    monkeypatch.setitem(
+        sys.modules, "sentence_transformers",
+        types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer)
+    )
+    _load_encoder.cache_clear()
+    try:
+        first, second = EpisodicMemory(use_memory=False), EpisodicMemory(use_memory=False)
+        await first.connect()
+        await second.connect()
+    finally:
+        _load_encoder.cache_clear()
+
+    assert not first.use_memory and not second.use_memory
+    assert first._encoder is second._encoder
+    assert len(loads) == 1
+    # Warmed up once at load, before any query
+    assert len(encodes) == 1